@@ -14,6 +14,7 @@ from routes.audio_storage import audio_storage_bp
 from routes.subscriptions import subscriptions_bp
 from routes.legal import legal_bp
 from routes.account_deletion import account_deletion_bp
+from utils.auth import init_auth
 import logging
 import sys
 import os
@@ -161,6 +162,9 @@ def create_app(config_name=None):
         logger.error(f"❌ Failed to start scheduler: {e}")
         logger.warning("⚠️ Continuing without background scheduling")
     
+    # Initialize the token verification service for the auth decorators
+    init_auth(app.firebase_service)
+    
     # Initialize notification services for the blueprint
     init_notification_services(
         app.firebase_service, 
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from services.firebase_service import FirebaseService
 from models.user import User
 from functools import wraps
+from utils.auth import verify_with_cache, BEARER_PREFIX_LEN
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -15,11 +16,11 @@ def require_auth(f):
             return jsonify({"error": "Authorization required"}), 401
         
         # Extract token
-        id_token = auth_header.split('Bearer ')[1]
+        id_token = auth_header[BEARER_PREFIX_LEN:]
         
         # Verify token with Firebase
         firebase_service = current_app.firebase_service
-        decoded_token = firebase_service.verify_id_token(id_token)
+        decoded_token = verify_with_cache(id_token, firebase_service.verify_id_token)
         
         if not decoded_token:
             return jsonify({"error": "Invalid or expired token"}), 401
@@ -10,6 +10,7 @@ import logging
 import json
 import threading
 from functools import wraps
+from utils.auth import verify_with_cache, BEARER_PREFIX_LEN
 from contextlib import contextmanager
 
 chat_bp = Blueprint('chat', __name__)
@@ -77,11 +78,11 @@ def require_auth(f):
             return jsonify({"error": "Authorization required"}), 401
         
         # Extract token
-        id_token = auth_header.split('Bearer ')[1]
+        id_token = auth_header[BEARER_PREFIX_LEN:]
         
         # Verify token with Firebase
         firebase_service = current_app.firebase_service
-        decoded_token = firebase_service.verify_id_token(id_token)
+        decoded_token = verify_with_cache(id_token, firebase_service.verify_id_token)
         
         if not decoded_token:
             logger.warning("❌ Invalid or expired token")
@@ -138,6 +138,16 @@ def create_tasks_batch():
                         notification_service.send_task_approval_notification(task_obj)
                     except Exception as e:
                         logger.warning(f"⚠️ Failed to send notification: {e}")
+            
+            # Schedule reminders for every auto-approved task
+            if scheduler_service:
+                for task_dict in created_tasks:
+                    try:
+                        task_obj = Task.from_dict(task_dict)
+                        if task_obj.reminders:
+                            scheduler_service.schedule_reminder_for_task(task_obj)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Failed to schedule reminders: {e}")
         
         elapsed_time = time.time() - start_time
         logger.info(f"🎉 Batch created {len(created_tasks)} tasks in {elapsed_time:.2f}s")
@@ -508,6 +518,10 @@ def delete_task(task_id):
         firebase_service.update_task(task_id, updates)
         logger.info(f"✅ Task {task_id} soft deleted successfully")
         
+        scheduler_service = getattr(current_app, 'scheduler_service', None)
+        if scheduler_service:
+            scheduler_service.cancel_reminders_for_task(task_id)
+        
         return jsonify({"message": "Task deleted successfully"})
         
     except Exception as e:
@@ -1593,8 +1607,7 @@ def update_single_reminder(task_id, reminder_id):
                 'updated_at': datetime.utcnow().isoformat()
             })
 
-            # Notify scheduler about the update (for logging purposes)
-            # Note: Scheduler uses polling-based system, so no explicit rescheduling needed
+            # Reschedule the task's reminder jobs so the edited time takes effect
             scheduler_service = getattr(current_app, 'scheduler_service', None)
             if scheduler_service:
                 try:
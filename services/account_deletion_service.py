@@ -641,18 +641,25 @@ class AccountDeletionService:
             import os
             user_voice_dir = f"voice_recordings/{user_id}"
 
-            if os.path.exists(user_voice_dir):
-                for root, dirs, files in os.walk(user_voice_dir):
-                    for file in files:
-                        if file.endswith('.wav'):
-                            file_path = os.path.join(root, file)
-                            file_stats = os.stat(file_path)
-                            voice_data.append({
-                                "filename": file,
-                                "created_date": datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
-                                "size_bytes": file_stats.st_size,
-                                "relative_path": os.path.relpath(file_path, user_voice_dir)
-                            })
+            # Iterative scandir: entries carry their own path and type, so only
+            # the .wav files themselves need a stat
+            pending_dirs = [user_voice_dir]
+            while pending_dirs:
+                try:
+                    with os.scandir(pending_dirs.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending_dirs.append(entry.path)
+                            elif entry.name.endswith('.wav') and entry.is_file():
+                                file_stats = entry.stat()
+                                voice_data.append({
+                                    "filename": entry.name,
+                                    "created_date": datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
+                                    "size_bytes": file_stats.st_size,
+                                    "relative_path": os.path.relpath(entry.path, user_voice_dir)
+                                })
+                except FileNotFoundError:
+                    continue
 
             return voice_data
         except Exception as e:
@@ -1,11 +1,15 @@
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
+from google.api_core.exceptions import NotFound
 import pyrebase
 from config import Config
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set
 import json
 import logging
 
+# Maximum number of writes Firestore accepts in a single batch commit
+FIRESTORE_BATCH_LIMIT = 500
+
 class FirebaseService:
     def __init__(self):
         self.logger = logging.getLogger('braindumpster.firebase')
@@ -769,6 +773,25 @@ class FirebaseService:
             self.logger.error(f"❌ Error getting all users: {str(e)}")
             return []
     
+    def iter_all_users(self) -> Iterator[Dict]:
+        """Stream all users one document at a time instead of building a list"""
+        self.logger.info("👥 Streaming all users")
+        
+        if not self.db:
+            self.logger.warning("⚠️ Firebase not configured - no users to stream")
+            return
+        
+        try:
+            count = 0
+            for doc in self.db.collection('users').stream():
+                user_data = doc.to_dict()
+                user_data['id'] = doc.id
+                count += 1
+                yield user_data
+            self.logger.info(f"✅ Streamed {count} users")
+        except Exception as e:
+            self.logger.error(f"❌ Error streaming users: {str(e)}")
+    
     def get_due_reminders(self, user_id: str, current_time, user_timezone: str = None) -> List[Dict]:
         """Get due reminders for a user"""
         from datetime import datetime, timezone
@@ -844,6 +867,110 @@ class FirebaseService:
             self.logger.error(f"❌ Error getting due reminders: {str(e)}")
             return []
     
+    def get_all_due_reminders(self, current_time, until=None, expire_before=None) -> Optional[List[Dict]]:
+        """Get due reminders across all users with a single task query
+
+        Reminders live inside their task documents, so one query over active tasks
+        replaces the per-user get_due_reminders loop and already hydrates each task.
+        User timezones (needed only for naive reminder times) are batch-read.
+
+        Args:
+            current_time: Reminders at or before this time are due
+            until: Optionally also return upcoming reminders up to this time
+            expire_before: Reminders older than this are flagged 'expired' so callers
+                can mark them sent without notifying
+
+        Returns:
+            List of due reminder dicts, each carrying its raw task under 'task',
+            or None if the query failed.
+        """
+        from datetime import timezone
+        
+        self.logger.info("⏰ Getting due reminders for all users")
+        
+        if not self.db:
+            self.logger.warning("⚠️ Firebase not configured - returning empty reminder list")
+            return []
+        
+        try:
+            comparison_time = until or current_time
+            if comparison_time.tzinfo is None:
+                comparison_time = comparison_time.replace(tzinfo=timezone.utc)
+            
+            query = self.db.collection('tasks').where('status', 'in', ['approved', 'pending'])
+            
+            tasks = []
+            for doc in query.stream():
+                task_data = doc.to_dict()
+                if task_data.get('archived', False):
+                    continue
+                if not any(not r.get('sent', False) and r.get('reminder_time') for r in task_data.get('reminders', [])):
+                    continue
+                task_data['id'] = doc.id
+                tasks.append(task_data)
+            
+            user_timezones = self._get_user_timezones({task.get('user_id') for task in tasks if task.get('user_id')})
+            
+            due_reminders = []
+            for task in tasks:
+                user_timezone = user_timezones.get(task.get('user_id'), 'UTC')
+                for reminder in task.get('reminders', []):
+                    reminder_time_str = reminder.get('reminder_time')
+                    if not reminder_time_str or reminder.get('sent', False):
+                        continue
+                    if not isinstance(reminder_time_str, str):
+                        continue
+                    
+                    try:
+                        reminder_time = self._parse_reminder_time(reminder_time_str, user_timezone, check_if_past=False)
+                        if reminder_time is None or reminder_time > comparison_time:
+                            continue
+                        
+                        # Reminders without a stored ID can't be marked as sent, so a
+                        # generated one would only get them re-sent on every sweep
+                        reminder_id = reminder.get('id')
+                        if not reminder_id:
+                            self.logger.warning(f"⚠️ Skipping due reminder without an ID in task {task['id']}")
+                            continue
+                        
+                        due_reminders.append({
+                            'task_id': task['id'],
+                            'reminder_id': reminder_id,
+                            'reminder_time': reminder_time,
+                            'message': reminder.get('message', ''),
+                            'task_title': task.get('title', ''),
+                            'task_priority': task.get('priority', 'medium'),
+                            'expired': expire_before is not None and reminder_time < expire_before,
+                            'task': task
+                        })
+                    except Exception as e:
+                        self.logger.error(f"❌ Error parsing reminder time: {e}")
+                        continue
+            
+            self.logger.info(f"✅ Found {len(due_reminders)} due reminders across {len(tasks)} active tasks")
+            return due_reminders
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error getting all due reminders: {str(e)}")
+            return None
+    
+    def _get_user_timezones(self, user_ids) -> Dict[str, str]:
+        """Batch-read timezone preferences for several users, defaulting to UTC"""
+        user_ids = list(user_ids)
+        timezones = {}
+        
+        for start in range(0, len(user_ids), 100):
+            refs = [self.db.collection('users').document(uid) for uid in user_ids[start:start + 100]]
+            try:
+                for user_doc in self.db.get_all(refs):
+                    if user_doc.exists:
+                        preferences = user_doc.to_dict().get('preferences', {})
+                        timezones[user_doc.id] = preferences.get('timezone', 'UTC')
+            except Exception as e:
+                self.logger.warning(f"⚠️ Error getting user timezones: {e}")
+        
+        return timezones
+    
     def _get_user_timezone(self, user_id: str) -> str:
         """Get user's timezone preference, default to UTC"""
         try:
@@ -990,9 +1117,116 @@ class FirebaseService:
             self.logger.error(f"❌ Error marking reminder as sent: {str(e)}")
             return False
     
+    def mark_reminders_as_sent_bulk(self, tasks: List[Dict], reminder_ids, expired_ids=(),
+                                    completed_task_ids=(), now=None) -> Set[str]:
+        """Mark many reminders as sent, one transactional read-modify-write per task
+
+        "Bulk" here means one call for the whole sweep, not one RPC: each task is
+        re-read inside its own transaction so reminders added, edited or deleted
+        since the caller's snapshot are not overwritten, and one failing task
+        (e.g. deleted mid-sweep) doesn't hold back the others. Completion is
+        re-checked against that fresh read as well.
+
+        Args:
+            tasks: Raw task dicts (with 'id' and 'reminders') as read by the caller
+            reminder_ids: IDs of the reminders to flag as sent
+            expired_ids: IDs of the reminders to flag as sent and expired (never notified)
+            completed_task_ids: IDs of tasks the caller expects to auto-complete in the same write
+            now: Caller's current UTC time, used for the completion timestamps
+
+        Returns:
+            IDs of the tasks actually auto-completed by this write
+        """
+        from datetime import datetime, timezone
+        
+        expired_ids = set(expired_ids)
+        reminder_ids = set(reminder_ids) | expired_ids
+        completed_task_ids = set(completed_task_ids)
+        now_iso = (now or datetime.now(timezone.utc)).replace(tzinfo=None).isoformat()
+        self.logger.info(f"✅ Marking {len(reminder_ids)} reminders as sent across {len(tasks)} tasks")
+        
+        if not self.db:
+            self.logger.warning("⚠️ Firebase not configured - skipping reminder update")
+            return set()
+        
+        updated_count = 0
+        completed_ids = set()
+        for task in tasks:
+            task_id = task['id']
+            # Skip tasks the caller's snapshot says have nothing to write
+            if task_id not in completed_task_ids and not any(
+                reminder.get('id') in reminder_ids for reminder in task.get('reminders', [])
+            ):
+                continue
+            
+            try:
+                task_ref = self.db.collection('tasks').document(task_id)
+                result = self._mark_task_reminders_sent(
+                    self.db.transaction(), task_ref, reminder_ids, expired_ids,
+                    now_iso if task_id in completed_task_ids else None
+                )
+                if result:
+                    updated_count += 1
+                if result == 'completed':
+                    completed_ids.add(task_id)
+            except Exception as e:
+                self.logger.error(f"❌ Error marking reminders as sent for task {task_id}: {str(e)}")
+        
+        self.logger.info(f"✅ Reminder sent flags committed for {updated_count} tasks ({len(completed_ids)} auto-completed)")
+        return completed_ids
+    
+    @staticmethod
+    @firestore.transactional
+    def _mark_task_reminders_sent(transaction, task_ref, reminder_ids, expired_ids, completed_at) -> Optional[str]:
+        """Flag a task's reminders as sent (and optionally complete it) from a fresh read
+
+        Returns 'completed' if the task was auto-completed, 'updated' if only the
+        flags were written and None if nothing was written.
+        """
+        snapshot = task_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            return None
+        
+        task_data = snapshot.to_dict()
+        reminders = task_data.get('reminders', [])
+        updated = False
+        for reminder in reminders:
+            if reminder.get('id') in reminder_ids and not reminder.get('sent', False):
+                reminder['sent'] = True
+                if reminder.get('id') in expired_ids:
+                    reminder['expired'] = True
+                updated = True
+        
+        # The caller's completion decision came from its own snapshot - only honour it
+        # if the fresh document still has no due_date and every reminder is now sent
+        if completed_at is not None and not (
+            task_data.get('status') in ('pending', 'approved')
+            and not task_data.get('due_date')
+            and reminders
+            and all(reminder.get('sent', False) for reminder in reminders)
+        ):
+            completed_at = None
+        
+        if not updated and completed_at is None:
+            return None
+        
+        task_updates = {
+            'reminders': reminders,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }
+        if completed_at is not None:
+            task_updates.update({
+                'status': 'completed',
+                'completed_at': completed_at,
+                'updated_at': completed_at,
+                'auto_completed': True
+            })
+        transaction.update(task_ref, task_updates)
+        return 'completed' if completed_at is not None else 'updated'
+    
     def get_user_daily_stats(self, user_id: str) -> Dict:
         """Get daily task statistics for a user"""
-        from datetime import datetime, date
+        from datetime import date
         
         self.logger.info(f"📊 Getting daily stats for user: {user_id}")
         
@@ -1002,39 +1236,7 @@ class FirebaseService:
         
         try:
             tasks = self.get_user_tasks(user_id)
-            today = date.today()
-            
-            pending_tasks = 0
-            completed_tasks_today = 0
-            
-            for task in tasks:
-                # Count pending tasks
-                if task.get('status') in ['pending', 'approved']:
-                    pending_tasks += 1
-                
-                # Count completed tasks from today
-                if task.get('status') == 'completed':
-                    updated_at = task.get('updated_at')
-                    if updated_at:
-                        try:
-                            if hasattr(updated_at, 'date'):
-                                task_date = updated_at.date()
-                            else:
-                                # Parse ISO string
-                                task_datetime = datetime.fromisoformat(str(updated_at).replace('Z', '+00:00'))
-                                task_date = task_datetime.date()
-                            
-                            if task_date == today:
-                                completed_tasks_today += 1
-                        except Exception as e:
-                            self.logger.error(f"❌ Error parsing task date: {e}")
-                            continue
-            
-            stats = {
-                'pending_tasks': pending_tasks,
-                'completed_tasks': completed_tasks_today,
-                'date': today.isoformat()
-            }
+            stats = self._count_daily_stats(tasks, date.today())
             
             self.logger.info(f"✅ Daily stats calculated: {stats}")
             return stats
@@ -1043,6 +1245,86 @@ class FirebaseService:
             self.logger.error(f"❌ Error getting daily stats: {str(e)}")
             return {}
     
+    def get_daily_stats_for_active_users(self) -> Optional[Dict[str, Dict]]:
+        """Get daily stats for every user with pending tasks or tasks completed today
+
+        One projected query over the tasks collection replaces a scan of all users
+        plus a task query per user; users with nothing to report never show up.
+
+        Returns:
+            Dict of user_id -> stats (same shape as get_user_daily_stats),
+            or None if the query failed.
+        """
+        from datetime import date
+        
+        self.logger.info("📊 Getting daily stats for active users")
+        
+        if not self.db:
+            self.logger.warning("⚠️ Firebase not configured - returning empty stats")
+            return {}
+        
+        try:
+            query = self.db.collection('tasks')\
+                .where('status', 'in', ['pending', 'approved', 'completed'])\
+                .select(['user_id', 'status', 'updated_at', 'archived'])
+            
+            tasks_by_user = {}
+            for doc in query.stream():
+                task_data = doc.to_dict()
+                if task_data.get('archived', False) or not task_data.get('user_id'):
+                    continue
+                tasks_by_user.setdefault(task_data['user_id'], []).append(task_data)
+            
+            today = date.today()
+            stats_by_user = {}
+            for user_id, tasks in tasks_by_user.items():
+                stats = self._count_daily_stats(tasks, today)
+                if stats['pending_tasks'] > 0 or stats['completed_tasks'] > 0:
+                    stats_by_user[user_id] = stats
+            
+            self.logger.info(f"✅ Daily stats calculated for {len(stats_by_user)} active users")
+            return stats_by_user
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error getting daily stats for active users: {str(e)}")
+            return None
+    
+    def _count_daily_stats(self, tasks: List[Dict], today) -> Dict:
+        """Count pending tasks and tasks completed today"""
+        from datetime import datetime
+        
+        pending_tasks = 0
+        completed_tasks_today = 0
+        
+        for task in tasks:
+            # Count pending tasks
+            if task.get('status') in ['pending', 'approved']:
+                pending_tasks += 1
+            
+            # Count completed tasks from today
+            if task.get('status') == 'completed':
+                updated_at = task.get('updated_at')
+                if updated_at:
+                    try:
+                        if hasattr(updated_at, 'date'):
+                            task_date = updated_at.date()
+                        else:
+                            # Parse ISO string
+                            task_datetime = datetime.fromisoformat(str(updated_at).replace('Z', '+00:00'))
+                            task_date = task_datetime.date()
+                        
+                        if task_date == today:
+                            completed_tasks_today += 1
+                    except Exception as e:
+                        self.logger.error(f"❌ Error parsing task date: {e}")
+                        continue
+        
+        return {
+            'pending_tasks': pending_tasks,
+            'completed_tasks': completed_tasks_today,
+            'date': today.isoformat()
+        }
+    
     def get_old_completed_tasks(self, user_id: str, cutoff_date) -> List[Dict]:
         """Get completed tasks older than cutoff date"""
         self.logger.info(f"📅 Getting old completed tasks for user: {user_id}")
@@ -1101,6 +1383,60 @@ class FirebaseService:
             self.logger.error(f"❌ Error archiving task: {str(e)}")
             return False
     
+    def _commit_updates_in_batches(self, updates: List) -> int:
+        """Apply (document_ref, fields) updates through WriteBatch commits of up to 500 writes
+
+        Returns:
+            Number of updates committed
+        """
+        committed = 0
+        for start in range(0, len(updates), FIRESTORE_BATCH_LIMIT):
+            chunk = updates[start:start + FIRESTORE_BATCH_LIMIT]
+            try:
+                batch = self.db.batch()
+                for doc_ref, fields in chunk:
+                    batch.update(doc_ref, fields)
+                batch.commit()
+                committed += len(chunk)
+            except Exception as e:
+                # A batch fails as a whole (e.g. one document was deleted meanwhile),
+                # so apply its updates one by one and skip only the failing documents
+                self.logger.warning(f"⚠️ Write batch failed, retrying its {len(chunk)} updates individually: {str(e)}")
+                for doc_ref, fields in chunk:
+                    try:
+                        doc_ref.update(fields)
+                        committed += 1
+                    except NotFound:
+                        self.logger.warning(f"⚠️ Document not found, skipping update: {doc_ref.id}")
+                    except Exception as doc_error:
+                        self.logger.error(f"❌ Error updating document {doc_ref.id}: {str(doc_error)}")
+        return committed
+    
+    def archive_tasks_bulk(self, task_ids: List[str]) -> int:
+        """Archive many tasks (soft delete) using batched writes
+
+        Returns:
+            Number of tasks archived
+        """
+        self.logger.info(f"🗄️ Archiving {len(task_ids)} tasks in batch mode")
+        
+        if not self.db:
+            self.logger.warning("⚠️ Firebase not configured - skipping archive")
+            return 0
+        
+        updates = [
+            (self.db.collection('tasks').document(task_id), {
+                'archived': True,
+                'archived_at': firestore.SERVER_TIMESTAMP,
+                'updated_at': firestore.SERVER_TIMESTAMP
+            })
+            for task_id in task_ids
+        ]
+        archived_count = self._commit_updates_in_batches(updates)
+        
+        self.logger.info(f"✅ Archived {archived_count}/{len(task_ids)} tasks")
+        return archived_count
+    
     def get_notification_history(self, user_id: str, limit: int = 50) -> List[Dict]:
         """Get notification history for a user"""
         self.logger.info(f"📱 Getting notification history for user: {user_id}")
@@ -3,12 +3,80 @@ from config import Config
 from prompts.gemini_prompts import TASK_CREATION_PROMPT, CONTEXT_ANALYSIS_PROMPT
 from typing import Dict, List, Optional
 import json
+import mimetypes
 import re
 import logging
 import time
 import threading
 from datetime import datetime, timedelta
 
+# Map file extension to proper MIME type for uploaded audio
+AUDIO_MIME_TYPES = {
+    '.m4a': 'audio/mp4',
+    '.aac': 'audio/aac',
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg',
+    '.ogg': 'audio/ogg'
+}
+
+# Response-parsing patterns, compiled once at import
+JSON_BLOCK_RE = re.compile(r'```json\n(.*?)\n```', re.DOTALL)
+
+# Fallback JSON block patterns, from strictest to most lenient
+JSON_BLOCK_FALLBACK_RES = (
+    JSON_BLOCK_RE,  # Standard: ```json\n{...}\n```
+    re.compile(r'```json\s+(.*?)\s+```', re.DOTALL),  # With whitespace
+    re.compile(r'```json(.*?)```', re.DOTALL),  # No whitespace
+    re.compile(r'```\s*json\s*(.*?)```', re.DOTALL),  # Flexible whitespace
+)
+
+USER_INTENT_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'user_intent["\s]*:["\s]*([^"]*)',
+    r'intent["\s]*:["\s]*([^"]*)',
+    r'wants to ([^"]*)',
+    r'user wants ([^"]*)',
+    r'trying to ([^"]*)',
+    r'planning to ([^"]*)',
+))
+
+TRANSCRIPTION_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'"transcription"\s*:\s*"([^"]+)"',
+    r'"user_intent"\s*:\s*"([^"]+)"',
+    r'transcribed[^:]*:\s*"([^"]+)"',
+    r'user said[^:]*:\s*"([^"]+)"',
+))
+
+USER_INTENT_VALUE_RE = re.compile(r'"user_intent"\s*:\s*"([^"]+)"')
+
+# Generation configs, built once and shared by every request of each kind
+AUDIO_ANALYSIS_GENERATION_CONFIG = {
+    "temperature": 0.7,  # Higher temperature for better speaker diarization and natural transcription
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 65536,  # High limit for long transcripts (gemini-2.0 supports up to 65k)
+}
+
+TRANSCRIPTION_GENERATION_CONFIG = {
+    "temperature": 0.2,  # Very low for accurate transcription
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 65536,
+}
+
+QUICK_ANALYSIS_GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,  # Smaller limit for quick analysis
+}
+
+DEEP_ANALYSIS_GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 65536,  # Full limit for deep analysis
+}
+
 class GeminiService:
     def __init__(self):
         self.logger = logging.getLogger('braindumpster.gemini')
@@ -188,14 +256,14 @@ class GeminiService:
             self.logger.info("📂 Reading audio file...")
             import os
             
-            # Check file size first
-            file_size = os.path.getsize(audio_file_path)
-            max_file_size = 10 * 1024 * 1024  # 10MB limit
-            
-            if file_size > max_file_size:
-                raise ValueError(f"Audio file too large: {file_size} bytes (max: {max_file_size} bytes)")
-            
             with open(audio_file_path, 'rb') as audio_file:
+                # Check file size first, from the open descriptor (no separate path stat)
+                file_size = os.fstat(audio_file.fileno()).st_size
+                max_file_size = 10 * 1024 * 1024  # 10MB limit
+                
+                if file_size > max_file_size:
+                    raise ValueError(f"Audio file too large: {file_size} bytes (max: {max_file_size} bytes)")
+                
                 audio_data = audio_file.read()
             
             self.logger.info(f"✅ Audio file read successfully - {len(audio_data)} bytes")
@@ -333,19 +401,14 @@ CRITICAL REQUIREMENTS:
             self.logger.debug("🎵 Creating audio part for Gemini API...")
             
             # Detect audio file format more accurately
-            import os
-            file_extension = os.path.splitext(audio_file_path)[1].lower()
-            
-            # Map file extension to proper MIME type
-            mime_type_mapping = {
-                '.m4a': 'audio/mp4',
-                '.aac': 'audio/aac', 
-                '.wav': 'audio/wav',
-                '.mp3': 'audio/mpeg',
-                '.ogg': 'audio/ogg'
-            }
-            
-            mime_type = mime_type_mapping.get(file_extension, 'audio/mp4')  # Default to mp4 for m4a files
+            file_extension = '.' + audio_file_path.rpartition('.')[2].lower()
+            
+            # Map file extension to proper MIME type, falling back to the stdlib table
+            # (audio types only; e.g. .3gp guesses video/3gpp)
+            mime_type = AUDIO_MIME_TYPES.get(file_extension)
+            if not mime_type:
+                guessed_type = mimetypes.guess_type(audio_file_path)[0]
+                mime_type = guessed_type if guessed_type and guessed_type.startswith('audio/') else 'audio/mp4'  # Default to mp4 for m4a files
             self.logger.info(f"🎵 Detected file extension: {file_extension}, using MIME type: {mime_type}")
             
             audio_part = {
@@ -416,14 +479,14 @@ CRITICAL REQUIREMENTS:
             self.logger.info("📂 Reading audio file for transcription...")
             import os
             
-            # Check file size first
-            file_size = os.path.getsize(audio_file_path)
-            max_file_size = 10 * 1024 * 1024  # 10MB limit
-            
-            if file_size > max_file_size:
-                raise ValueError(f"Audio file too large: {file_size} bytes (max: {max_file_size} bytes)")
-            
             with open(audio_file_path, 'rb') as audio_file:
+                # Check file size first, from the open descriptor (no separate path stat)
+                file_size = os.fstat(audio_file.fileno()).st_size
+                max_file_size = 10 * 1024 * 1024  # 10MB limit
+                
+                if file_size > max_file_size:
+                    raise ValueError(f"Audio file too large: {file_size} bytes (max: {max_file_size} bytes)")
+                
                 audio_data = audio_file.read()
             
             self.logger.info(f"✅ Audio file read for transcription - {len(audio_data)} bytes")
@@ -588,13 +651,12 @@ Please transcribe this audio recording to text. Return only the transcribed text
         
         try:
             # Look for JSON block in the response
-            json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
+            json_match = JSON_BLOCK_RE.search(response_text)
             if json_match:
                 self.logger.debug("✅ Found JSON block in response")
-                json_str = json_match.group(1).strip()
                 
-                # Parse the JSON strictly - no complex repair logic
-                parsed_data = json.loads(json_str)
+                # Parse the JSON strictly - no complex repair logic (json.loads skips surrounding whitespace)
+                parsed_data = json.loads(json_match.group(1))
                 self.logger.debug(f"✅ Successfully parsed JSON with {len(parsed_data.get('tasks', []))} tasks")
                 
                 # Validate and enhance the response
@@ -663,17 +725,8 @@ Please transcribe this audio recording to text. Return only the transcribed text
         """Extract user intent from a broken response as a fallback"""
         try:
             # Look for common patterns that might indicate user intent
-            patterns = [
-                r'user_intent["\s]*:["\s]*([^"]*)',
-                r'intent["\s]*:["\s]*([^"]*)',
-                r'wants to ([^"]*)',
-                r'user wants ([^"]*)',
-                r'trying to ([^"]*)',
-                r'planning to ([^"]*)',
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, response_text, re.IGNORECASE)
+            for pattern in USER_INTENT_RES:
+                match = pattern.search(response_text)
                 if match:
                     intent = match.group(1).strip()
                     if intent and len(intent) > 3:
@@ -695,25 +748,15 @@ Please transcribe this audio recording to text. Return only the transcribed text
     def _extract_transcription_from_response(self, response_text: str) -> str:
         """Extract transcription from Gemini response if available"""
         try:
-            # Look for common transcription patterns in the response
-            import re
-            
-            # Try to find transcription in the analysis section
-            transcription_patterns = [
-                r'"transcription"\s*:\s*"([^"]+)"',
-                r'"user_intent"\s*:\s*"([^"]+)"',
-                r'transcribed[^:]*:\s*"([^"]+)"',
-                r'user said[^:]*:\s*"([^"]+)"'
-            ]
-            
-            for pattern in transcription_patterns:
-                match = re.search(pattern, response_text, re.IGNORECASE)
+            # Look for common transcription patterns in the analysis section
+            for pattern in TRANSCRIPTION_RES:
+                match = pattern.search(response_text)
                 if match:
                     return match.group(1)
             
             # If no specific transcription found, try to extract from user_intent
             if 'user_intent' in response_text:
-                intent_match = re.search(r'"user_intent"\s*:\s*"([^"]+)"', response_text)
+                intent_match = USER_INTENT_VALUE_RE.search(response_text)
                 if intent_match:
                     return intent_match.group(1)
             
@@ -1055,9 +1098,6 @@ Please transcribe this audio recording to text. Return only the transcribed text
 
         try:
             from prompts.gemini_prompts import MEETING_ANALYSIS_PROMPT
-            import tempfile
-            import os
-            import google.generativeai as genai
 
             # Create prompt
             prompt = MEETING_ANALYSIS_PROMPT.format(
@@ -1069,46 +1109,24 @@ Please transcribe this audio recording to text. Return only the transcribed text
             if file_size_mb > 10:
                 self.logger.info(f"📁 Using Gemini File API for large file ({file_size_mb:.2f} MB)")
 
-                # Create temporary file
-                file_extension = mime_type.split('/')[-1]
-                if file_extension == 'mpeg':
-                    file_extension = 'mp3'
-                elif file_extension == 'mp4':
-                    file_extension = 'm4a'
-
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}')
+                uploaded_file = None
                 try:
-                    # Write audio data to temp file
-                    temp_file.write(audio_data)
-                    temp_file.flush()
-                    temp_file.close()
-
                     self.logger.info(f"📤 Uploading file to Gemini File API...")
                     # Upload file to Gemini
-                    uploaded_file = genai.upload_file(path=temp_file.name, mime_type=mime_type)
+                    uploaded_file = self._upload_audio(audio_data, mime_type)
                     self.logger.info(f"✅ File uploaded: {uploaded_file.name}")
 
                     # Wait for file to be processed
-                    import time
-                    while uploaded_file.state.name == "PROCESSING":
-                        self.logger.info("⏳ Waiting for file to be processed...")
-                        time.sleep(2)
-                        uploaded_file = genai.get_file(uploaded_file.name)
+                    uploaded_file = self._wait_for_file_processing(uploaded_file)
 
                     if uploaded_file.state.name == "FAILED":
                         raise Exception(f"File processing failed: {uploaded_file.state}")
 
                     self.logger.info(f"🤖 Sending to Gemini for analysis...")
                     # Call Gemini API with uploaded file and optimized config for audio
-                    generation_config = {
-                        "temperature": 0.7,  # Higher temperature for better speaker diarization and natural transcription
-                        "top_p": 0.95,
-                        "top_k": 40,
-                        "max_output_tokens": 65536,  # High limit for long transcripts (gemini-2.0 supports up to 65k)
-                    }
                     response = self.model.generate_content(
                         [prompt, uploaded_file],
-                        generation_config=generation_config
+                        generation_config=AUDIO_ANALYSIS_GENERATION_CONFIG
                     )
 
                     # Log response details
@@ -1127,38 +1145,26 @@ Please transcribe this audio recording to text. Return only the transcribed text
                     self.logger.info(f"📝 Response length: {len(response_text)} chars")
                     self.logger.info(f"   First 500 chars: {response_text[:500]}")
 
-                    # Delete uploaded file from Gemini
-                    self.logger.info(f"🗑️ Deleting uploaded file from Gemini...")
-                    genai.delete_file(uploaded_file.name)
-
                 finally:
-                    # Clean up temp file
-                    if os.path.exists(temp_file.name):
-                        os.unlink(temp_file.name)
-                        self.logger.info(f"🗑️ Cleaned up temp file")
+                    # Delete uploaded file from Gemini, also when processing or generation failed
+                    if uploaded_file is not None:
+                        self.logger.info(f"🗑️ Deleting uploaded file from Gemini...")
+                        self._delete_uploaded_file(uploaded_file)
 
             else:
                 # Use inline data for smaller files (< 10MB)
                 self.logger.info(f"📦 Using inline data for small file ({file_size_mb:.2f} MB)")
-                import base64
 
+                # Raw bytes; the SDK encodes the blob for transport itself
                 audio_part = {
-                    "inline_data": {
-                        "mime_type": mime_type,
-                        "data": base64.b64encode(audio_data).decode("utf-8")
-                    }
+                    "mime_type": mime_type,
+                    "data": audio_data
                 }
 
                 # Call Gemini API with optimized config for audio
-                generation_config = {
-                    "temperature": 0.7,  # Higher temperature for better speaker diarization and natural transcription
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 65536,  # High limit for long transcripts (gemini-2.0 supports up to 65k)
-                }
                 response = self.model.generate_content(
                     [prompt, audio_part],
-                    generation_config=generation_config
+                    generation_config=AUDIO_ANALYSIS_GENERATION_CONFIG
                 )
                 response_text = response.text.strip()
 
@@ -1187,6 +1193,39 @@ Please transcribe this audio recording to text. Return only the transcribed text
             self.logger.error(f"❌ Error analyzing recording: {str(e)}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    def _upload_audio(self, audio_data: bytes, mime_type: str):
+        """Upload in-memory audio to the Gemini File API
+
+        The bytes are handed to the SDK's resumable upload as a file object, so they
+        are not first written to and read back from a temporary file.
+        """
+        import io
+        import google.generativeai as genai
+        return genai.upload_file(path=io.BytesIO(audio_data), mime_type=mime_type, resumable=True)
+
+    def _wait_for_file_processing(self, uploaded_file, max_delay: float = 2.0):
+        """Poll an uploaded file until it leaves the PROCESSING state
+
+        Short clips are usually ready within a fraction of a second, so polling
+        starts at 100ms and backs off towards max_delay.
+        """
+        import google.generativeai as genai
+        delay = 0.1
+        while uploaded_file.state.name == "PROCESSING":
+            self.logger.info("⏳ Waiting for file to be processed...")
+            time.sleep(delay)
+            delay = min(delay * 1.7, max_delay)
+            uploaded_file = genai.get_file(uploaded_file.name)
+        return uploaded_file
+
+    def _delete_uploaded_file(self, uploaded_file):
+        """Delete a File API upload, logging instead of raising on failure"""
+        import google.generativeai as genai
+        try:
+            genai.delete_file(uploaded_file.name)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not delete uploaded file {uploaded_file.name}: {e}")
+
     def _create_fallback_analysis(self, duration: int, current_date: str):
         """
         Create a fallback analysis structure when Gemini fails to return valid JSON
@@ -1350,9 +1389,6 @@ Please transcribe this audio recording to text. Return only the transcribed text
 
         try:
             from prompts.gemini_prompts import TRANSCRIPTION_ONLY_PROMPT
-            import tempfile
-            import os
-            import google.generativeai as genai
 
             # Create prompt
             prompt = TRANSCRIPTION_ONLY_PROMPT.format(
@@ -1364,77 +1400,46 @@ Please transcribe this audio recording to text. Return only the transcribed text
             if file_size_mb > 10:
                 self.logger.info(f"📁 Using File API for transcription ({file_size_mb:.2f} MB)")
 
-                # Create temporary file
-                file_extension = mime_type.split('/')[-1]
-                if file_extension == 'mpeg':
-                    file_extension = 'mp3'
-                elif file_extension == 'mp4':
-                    file_extension = 'm4a'
-
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}')
+                uploaded_file = None
                 try:
-                    temp_file.write(audio_data)
-                    temp_file.flush()
-                    temp_file.close()
-
                     self.logger.info(f"📤 Uploading file for transcription...")
-                    uploaded_file = genai.upload_file(path=temp_file.name, mime_type=mime_type)
+                    uploaded_file = self._upload_audio(audio_data, mime_type)
                     self.logger.info(f"✅ File uploaded: {uploaded_file.name}")
 
                     # Wait for processing
-                    import time
-                    while uploaded_file.state.name == "PROCESSING":
-                        self.logger.info("⏳ Waiting for file processing...")
-                        time.sleep(2)
-                        uploaded_file = genai.get_file(uploaded_file.name)
+                    uploaded_file = self._wait_for_file_processing(uploaded_file)
 
                     if uploaded_file.state.name == "FAILED":
                         raise Exception(f"File processing failed: {uploaded_file.state}")
 
                     self.logger.info(f"🤖 Sending transcription request to Gemini...")
                     # Optimized config for transcription (fast, accurate)
-                    generation_config = {
-                        "temperature": 0.2,  # Very low for accurate transcription
-                        "top_p": 0.95,
-                        "top_k": 40,
-                        "max_output_tokens": 65536,
-                    }
                     response = self.model.generate_content(
                         [prompt, uploaded_file],
-                        generation_config=generation_config
+                        generation_config=TRANSCRIPTION_GENERATION_CONFIG
                     )
 
                     response_text = response.text.strip()
                     self.logger.info(f"✅ Transcription complete: {len(response_text)} chars")
 
-                    # Delete uploaded file
-                    genai.delete_file(uploaded_file.name)
-
                 finally:
-                    if os.path.exists(temp_file.name):
-                        os.unlink(temp_file.name)
+                    # Delete uploaded file, also when processing or generation failed
+                    if uploaded_file is not None:
+                        self._delete_uploaded_file(uploaded_file)
 
             else:
                 # Inline data for small files
                 self.logger.info(f"📦 Using inline data for transcription ({file_size_mb:.2f} MB)")
-                import base64
 
+                # Raw bytes; the SDK encodes the blob for transport itself
                 audio_part = {
-                    "inline_data": {
-                        "mime_type": mime_type,
-                        "data": base64.b64encode(audio_data).decode("utf-8")
-                    }
+                    "mime_type": mime_type,
+                    "data": audio_data
                 }
 
-                generation_config = {
-                    "temperature": 0.2,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 65536,
-                }
                 response = self.model.generate_content(
                     [prompt, audio_part],
-                    generation_config=generation_config
+                    generation_config=TRANSCRIPTION_GENERATION_CONFIG
                 )
                 response_text = response.text.strip()
 
@@ -1477,13 +1482,7 @@ Please transcribe this audio recording to text. Return only the transcribed text
             )
 
             self.logger.info("🚀 Sending quick analysis request to Gemini...")
-            generation_config = {
-                "temperature": 0.4,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,  # Smaller limit for quick analysis
-            }
-            response = self.model.generate_content(prompt, generation_config=generation_config)
+            response = self.model.generate_content(prompt, generation_config=QUICK_ANALYSIS_GENERATION_CONFIG)
             response_text = response.text.strip()
 
             self.logger.info(f"✅ Quick analysis response: {len(response_text)} chars")
@@ -1529,13 +1528,7 @@ Please transcribe this audio recording to text. Return only the transcribed text
             )
 
             self.logger.info("🚀 Sending deep analysis request to Gemini...")
-            generation_config = {
-                "temperature": 0.4,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 65536,  # Full limit for deep analysis
-            }
-            response = self.model.generate_content(prompt, generation_config=generation_config)
+            response = self.model.generate_content(prompt, generation_config=DEEP_ANALYSIS_GENERATION_CONFIG)
             response_text = response.text.strip()
 
             self.logger.info(f"✅ Deep analysis response: {len(response_text)} chars")
@@ -1559,7 +1552,6 @@ Please transcribe this audio recording to text. Return only the transcribed text
         Extract JSON from Gemini response
         Handles both ```json ... ``` blocks and raw JSON
         """
-        import re
         import json
 
         try:
@@ -1567,20 +1559,15 @@ Please transcribe this audio recording to text. Return only the transcribed text
             self.logger.debug(f"📏 Full response length: {len(response_text)} chars")
 
             # Try multiple patterns to match JSON blocks
-            patterns = [
-                r'```json\n(.*?)\n```',  # Standard: ```json\n{...}\n```
-                r'```json\s+(.*?)\s+```',  # With whitespace
-                r'```json(.*?)```',  # No whitespace
-                r'```\s*json\s*(.*?)```',  # Flexible whitespace
-            ]
+            patterns = JSON_BLOCK_FALLBACK_RES
 
             self.logger.info(f"🔍 Trying {len(patterns)} regex patterns to extract JSON...")
             self.logger.info(f"   Response starts with: {repr(response_text[:50])}")
             self.logger.info(f"   Response ends with: {repr(response_text[-50:])}")
 
             for i, pattern in enumerate(patterns):
-                self.logger.info(f"   Pattern {i+1}: {pattern}")
-                json_match = re.search(pattern, response_text, re.DOTALL)
+                self.logger.info(f"   Pattern {i+1}: {pattern.pattern}")
+                json_match = pattern.search(response_text)
                 if json_match:
                     self.logger.info(f"✅ Found JSON block with pattern {i+1}")
                     json_str = json_match.group(1).strip()
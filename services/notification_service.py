@@ -1,6 +1,9 @@
 import json
+import asyncio
+import concurrent.futures
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 import os
 from firebase_admin import messaging
@@ -23,6 +26,11 @@ file_handler.setFormatter(file_formatter)
 logger.addHandler(file_handler)
 logger.info("📝 Notification logging to reminders.log initialized")
 
+# Maximum number of messages FCM accepts in a single send_each call
+FCM_BATCH_LIMIT = 500
+# Longest a caller waits on the background event loop for a batch of sends (seconds)
+ASYNC_SEND_TIMEOUT = 120
+
 class NotificationService:
     """Service for managing push notifications via Firebase Cloud Messaging (FCM)"""
 
@@ -38,6 +46,38 @@ class NotificationService:
         }
         # In-memory cache for last notification times (user_id -> notification_type -> timestamp)
         self._last_notification_times = {}
+        # Long-lived event loop for async FCM sends. The SDK keeps its HTTP/2 client
+        # bound to the loop it was first used on, so every batch must run on the same one.
+        self._async_loop = None
+        self._async_loop_pid = None
+        self._async_loop_lock = threading.Lock()
+
+    def run_async(self, coro):
+        """
+        Run a coroutine on the service's background event loop and wait for the result
+
+        Args:
+            coro: Coroutine to execute
+
+        Returns:
+            The coroutine's return value
+        """
+        with self._async_loop_lock:
+            # A forked process inherits the loop object but not the thread running it
+            if self._async_loop is None or self._async_loop_pid != os.getpid():
+                self._async_loop = asyncio.new_event_loop()
+                self._async_loop_pid = os.getpid()
+                threading.Thread(
+                    target=self._async_loop.run_forever,
+                    name='notification-async-loop',
+                    daemon=True
+                ).start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._async_loop)
+        try:
+            return future.result(timeout=ASYNC_SEND_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
 
     def _can_send_notification(self, user_id: str, notification_type: str) -> bool:
         """
@@ -72,6 +112,64 @@ class NotificationService:
         self._last_notification_times[user_id][notification_type] = now
         return True
 
+    def _stringify_data(self, data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Convert data payload values to strings (FCM requirement)"""
+        string_data = {}
+        if data:
+            for key, value in data.items():
+                if isinstance(value, (dict, list)):
+                    string_data[key] = json.dumps(value)
+                else:
+                    string_data[key] = str(value)
+        return string_data
+
+    def _build_message(self, user_token: str, title: str, body: str, string_data: Dict[str, str]) -> messaging.Message:
+        """Build the FCM message sent to a single device token"""
+        return messaging.Message(
+            notification=messaging.Notification(
+                title=title,
+                body=body,
+            ),
+            data=string_data,
+            token=user_token,
+            android=messaging.AndroidConfig(
+                priority='high',
+                notification=messaging.AndroidNotification(
+                    icon='ic_notification',
+                    color='#2196F3',
+                    sound='default',
+                    channel_id='voice_planner_tasks'
+                )
+            ),
+            apns=messaging.APNSConfig(
+                payload=messaging.APNSPayload(
+                    aps=messaging.Aps(
+                        alert=messaging.ApsAlert(
+                            title=title,
+                            body=body
+                        ),
+                        badge=1,
+                        sound='default'
+                    )
+                )
+            )
+        )
+
+    def _is_invalid_token_error(self, error_msg: str) -> bool:
+        """Check whether an FCM error means the device token should be cleaned up"""
+        # More comprehensive invalid token detection
+        invalid_token_indicators = [
+            "registration token is not a valid FCM registration token",
+            "Requested entity was not found",
+            "The registration token is not a valid FCM registration token",
+            "registration-token-not-registered",
+            "invalid-registration-token",
+            "mismatched-credential",
+            "invalid-apns-credentials",
+            "auth error from apns or web push service"
+        ]
+        return any(indicator in error_msg.lower() for indicator in invalid_token_indicators)
+
     def send_push_notification(
         self, 
         user_token: str, 
@@ -92,45 +190,8 @@ class NotificationService:
             bool: True if notification sent successfully, False otherwise
         """
         try:
-            # Convert data values to strings (FCM requirement)
-            string_data = {}
-            if data:
-                for key, value in data.items():
-                    if isinstance(value, (dict, list)):
-                        string_data[key] = json.dumps(value)
-                    else:
-                        string_data[key] = str(value)
-            
             # Create FCM message
-            message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                ),
-                data=string_data,
-                token=user_token,
-                android=messaging.AndroidConfig(
-                    priority='high',
-                    notification=messaging.AndroidNotification(
-                        icon='ic_notification',
-                        color='#2196F3',
-                        sound='default',
-                        channel_id='voice_planner_tasks'
-                    )
-                ),
-                apns=messaging.APNSConfig(
-                    payload=messaging.APNSPayload(
-                        aps=messaging.Aps(
-                            alert=messaging.ApsAlert(
-                                title=title,
-                                body=body
-                            ),
-                            badge=1,
-                            sound='default'
-                        )
-                    )
-                )
-            )
+            message = self._build_message(user_token, title, body, self._stringify_data(data))
             
             # Send message
             response = messaging.send(message)
@@ -141,19 +202,7 @@ class NotificationService:
             error_msg = str(e)
             logger.error(f"Firebase error sending push notification: {error_msg}")
 
-            # More comprehensive invalid token detection
-            invalid_token_indicators = [
-                "registration token is not a valid FCM registration token",
-                "Requested entity was not found",
-                "The registration token is not a valid FCM registration token",
-                "registration-token-not-registered",
-                "invalid-registration-token",
-                "mismatched-credential",
-                "invalid-apns-credentials",
-                "auth error from apns or web push service"
-            ]
-
-            if any(indicator in error_msg.lower() for indicator in invalid_token_indicators):
+            if self._is_invalid_token_error(error_msg):
                 logger.info(f"Invalid FCM token detected, will be cleaned up: {user_token[:20]}...")
                 return "INVALID_TOKEN"  # Special return value to trigger cleanup
 
@@ -164,6 +213,23 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Unexpected error sending push notification: {e}")
             return False
+
+    def _collect_batch_results(self, user_tokens: List[str], batch_response) -> Tuple[Dict[str, bool], List[str]]:
+        """Map a send_each response to per-token results and the tokens to clean up"""
+        results = {}
+        invalid_tokens = []
+        for token, response in zip(user_tokens, batch_response.responses):
+            if response.success:
+                results[token] = True
+                continue
+
+            error_msg = str(response.exception)
+            logger.error(f"Firebase error sending push notification: {error_msg}")
+            if self._is_invalid_token_error(error_msg):
+                logger.info(f"Invalid FCM token detected, will be cleaned up: {token[:20]}...")
+                invalid_tokens.append(token)
+            results[token] = False
+        return results, invalid_tokens
     
     def send_bulk_notifications(
         self,
@@ -187,29 +253,28 @@ class NotificationService:
             Dict[str, bool]: Results for each token
         """
         logger.info(f"            📬 send_bulk_notifications: Sending to {len(user_tokens)} token(s)")
-        results = {}
-        invalid_tokens = []
+        if not user_tokens:
+            return {}
 
-        for idx, token in enumerate(user_tokens):
-            logger.info(f"               🔄 Processing token #{idx+1}/{len(user_tokens)}: {token[:20]}...")
-            result = self.send_push_notification(token, title, body, data)
+        # One synchronous send_each call for all tokens; request handlers stay off the
+        # background event loop, which forked gunicorn workers don't have a thread for
+        string_data = self._stringify_data(data)
+        messages = [self._build_message(token, title, body, string_data) for token in user_tokens]
+        try:
+            batch_response = messaging.send_each(messages)
+        except Exception as e:
+            logger.error(f"Unexpected error sending push notifications: {e}")
+            return {token: False for token in user_tokens}
 
-            if result == "INVALID_TOKEN":
-                logger.warning(f"               ⚠️  Token #{idx+1} is INVALID - will be cleaned up")
-                invalid_tokens.append(token)
-                results[token] = False
-            else:
-                status = "✅ SUCCESS" if result else "❌ FAILED"
-                logger.info(f"               {status} for token #{idx+1}")
-                results[token] = result
+        results, invalid_tokens = self._collect_batch_results(user_tokens, batch_response)
 
         # Clean up invalid tokens if we have a user_id
         if invalid_tokens and user_id:
             logger.info(f"            🧹 Cleaning up {len(invalid_tokens)} invalid token(s) for user {user_id}")
             self.cleanup_invalid_tokens(user_id, invalid_tokens)
-        elif invalid_tokens:
-            logger.warning(f"            ⚠️  Found {len(invalid_tokens)} invalid token(s) but no user_id for cleanup")
 
+        success_count = sum(1 for result in results.values() if result)
+        logger.info(f"            ✅ {success_count}/{len(user_tokens)} token(s) delivered")
         return results
     
     def register_device_token(self, user_id: str, fcm_token: str) -> bool:
@@ -302,6 +367,50 @@ class NotificationService:
         titles = friendly_titles.get(priority_str, friendly_titles['medium'])
         return random.choice(titles)
 
+    def _build_reminder_content(self, reminder: Reminder, task: Task):
+        """
+        Build the title, body and data payload for a reminder notification
+
+        Args:
+            reminder: Reminder object
+            task: Task object
+
+        Returns:
+            tuple: (title, body, data)
+        """
+        # Create friendly notification content
+        # First, try to use Gemini-generated notification from reminder
+        if hasattr(reminder, 'notification') and reminder.notification and isinstance(reminder.notification, dict):
+            title = reminder.notification.get('title', self._get_friendly_reminder_title(task.priority))
+            body = reminder.notification.get('body', task.title)
+            logger.debug("         📝 Using Gemini-generated notification")
+        else:
+            # Fallback to manual generation if no Gemini notification
+            logger.debug("         ⚙️  Using fallback notification (no Gemini data)")
+            title = self._get_friendly_reminder_title(task.priority)
+            body = f"{task.title}"
+
+            # Add reminder-specific message if available
+            if reminder.message and reminder.message.strip():
+                body = f"{reminder.message}: {task.title}"
+                logger.debug("         Custom message: '%s'", reminder.message)
+
+        logger.debug("         Notification title: '%s'", title)
+        logger.debug("         Notification body: '%s'", body)
+
+        # Create data payload
+        data = {
+            'type': 'reminder',
+            'task_id': task.id,
+            'reminder_id': reminder.id,
+            'task_title': task.title,
+            'task_description': task.description or '',
+            'task_priority': task.priority.value if hasattr(task.priority, 'value') else str(task.priority),
+            'reminder_time': reminder.reminder_time.isoformat(),
+            'action': 'open_task'
+        }
+        return title, body, data
+
     def send_reminder_notification(self, reminder: Reminder, task: Task) -> bool:
         """
         Send a reminder notification for a specific task
@@ -337,39 +446,7 @@ class NotificationService:
             for idx, token in enumerate(user_tokens):
                 logger.info(f"         Token #{idx+1}: {token[:20]}...")
 
-            # Create friendly notification content
-            # First, try to use Gemini-generated notification from reminder
-            if hasattr(reminder, 'notification') and reminder.notification and isinstance(reminder.notification, dict):
-                title = reminder.notification.get('title', self._get_friendly_reminder_title(task.priority))
-                body = reminder.notification.get('body', task.title)
-                logger.info(f"         📝 Using Gemini-generated notification")
-                logger.info(f"         Title: '{title}'")
-                logger.info(f"         Body: '{body}'")
-            else:
-                # Fallback to manual generation if no Gemini notification
-                logger.info(f"         ⚙️  Using fallback notification (no Gemini data)")
-                title = self._get_friendly_reminder_title(task.priority)
-                body = f"{task.title}"
-
-                # Add reminder-specific message if available
-                if reminder.message and reminder.message.strip():
-                    body = f"{reminder.message}: {task.title}"
-                    logger.info(f"         Custom message: '{reminder.message}'")
-
-            logger.info(f"         Notification title: '{title}'")
-            logger.info(f"         Notification body: '{body}'")
-
-            # Create data payload
-            data = {
-                'type': 'reminder',
-                'task_id': task.id,
-                'reminder_id': reminder.id,
-                'task_title': task.title,
-                'task_description': task.description or '',
-                'task_priority': task.priority.value if hasattr(task.priority, 'value') else str(task.priority),
-                'reminder_time': reminder.reminder_time.isoformat(),
-                'action': 'open_task'
-            }
+            title, body, data = self._build_reminder_content(reminder, task)
             
             # Send to all user devices
             logger.info(f"         📤 Sending to {len(user_tokens)} device(s)...")
@@ -407,6 +484,151 @@ class NotificationService:
             logger.error(f"         Traceback: {traceback.format_exc()}")
             return False
     
+    async def send_notifications_bulk_async(
+        self,
+        entries: List[Tuple[str, str, str, str, Dict[str, Any]]]
+    ) -> List[bool]:
+        """
+        Send many notifications to many users in bulk
+
+        Every device message for every entry is flattened into
+        ``messaging.send_each_async`` calls of up to 500 messages (FCM's batch
+        limit), so a burst of notifications costs one network operation per
+        500 tokens instead of one per token.
+
+        Args:
+            entries: List of (user_id, notification_type, title, body, data) tuples
+
+        Returns:
+            List[bool]: Success flag for each entry, in input order
+        """
+        results = [False] * len(entries)
+        if not entries:
+            return results
+
+        # Frequency limits are checked up front, in input order
+        sendable = [
+            idx for idx, (user_id, notification_type, _, _, _) in enumerate(entries)
+            if self._can_send_notification(user_id, notification_type)
+        ]
+        if len(sendable) < len(entries):
+            logger.info(f"         ⏸️  Skipping {len(entries) - len(sendable)} notification(s) due to frequency limits")
+        if not sendable:
+            return results
+
+        # One token lookup per distinct user, run off the event loop
+        user_ids = list({entries[idx][0] for idx in sendable})
+        token_lists = await asyncio.gather(
+            *[asyncio.to_thread(self.firebase_service.get_user_tokens, user_id) for user_id in user_ids]
+        )
+        tokens_by_user = dict(zip(user_ids, token_lists))
+
+        messages = []
+        owners = []  # (entry index, token) for each message
+        for idx in sendable:
+            user_id, _, title, body, data = entries[idx]
+            user_tokens = tokens_by_user.get(user_id) or []
+            if not user_tokens:
+                logger.error(f"         ❌ No FCM tokens found for user {user_id}")
+                continue
+
+            string_data = self._stringify_data(data)
+            for token in user_tokens:
+                messages.append(self._build_message(token, title, body, string_data))
+                owners.append((idx, token))
+
+        if not messages:
+            return results
+
+        chunks = [messages[start:start + FCM_BATCH_LIMIT] for start in range(0, len(messages), FCM_BATCH_LIMIT)]
+        logger.info(f"         📤 Sending {len(messages)} message(s) in {len(chunks)} FCM batch(es)...")
+        batch_responses = await asyncio.gather(
+            *[messaging.send_each_async(chunk) for chunk in chunks],
+            return_exceptions=True
+        )
+
+        invalid_tokens_by_user = {}
+        for chunk_idx, batch_response in enumerate(batch_responses):
+            chunk_owners = owners[chunk_idx * FCM_BATCH_LIMIT:(chunk_idx + 1) * FCM_BATCH_LIMIT]
+            if isinstance(batch_response, Exception):
+                logger.error(f"Unexpected error sending FCM batch: {batch_response}")
+                continue
+
+            for (idx, token), response in zip(chunk_owners, batch_response.responses):
+                if response.success:
+                    results[idx] = True
+                    continue
+
+                error_msg = str(response.exception)
+                logger.error(f"Firebase error sending push notification: {error_msg}")
+                if self._is_invalid_token_error(error_msg):
+                    logger.info(f"Invalid FCM token detected, will be cleaned up: {token[:20]}...")
+                    invalid_tokens_by_user.setdefault(entries[idx][0], set()).add(token)
+
+        # Clean up invalid tokens
+        for user_id, invalid_tokens in invalid_tokens_by_user.items():
+            await asyncio.to_thread(self.cleanup_invalid_tokens, user_id, list(invalid_tokens))
+
+        sent_count = sum(1 for ok in results if ok)
+        logger.info(f"         📊 Bulk send results: {sent_count}/{len(entries)} notification(s) delivered")
+        return results
+
+    async def send_reminder_notifications_bulk_async(self, items: List[Tuple[Reminder, Task]]) -> List[bool]:
+        """
+        Send reminder notifications for many (reminder, task) pairs in bulk
+
+        Args:
+            items: List of (reminder, task) pairs
+
+        Returns:
+            List[bool]: Success flag for each pair, in input order
+        """
+        entries = [
+            (task.user_id, 'reminder', *self._build_reminder_content(reminder, task))
+            for reminder, task in items
+        ]
+        return await self.send_notifications_bulk_async(entries)
+
+    def send_reminder_notifications_bulk(self, items: List[Tuple[Reminder, Task]]) -> List[bool]:
+        """
+        Blocking wrapper around send_reminder_notifications_bulk_async
+
+        Args:
+            items: List of (reminder, task) pairs
+
+        Returns:
+            List[bool]: Success flag for each pair, in input order
+        """
+        return self.run_async(self.send_reminder_notifications_bulk_async(items))
+
+    async def send_task_completion_notifications_bulk_async(self, tasks: List[Task]) -> List[bool]:
+        """
+        Send completion notifications for many tasks in one bulk FCM dispatch
+
+        Args:
+            tasks: Completed task objects
+
+        Returns:
+            List[bool]: Success flag for each task, in input order
+        """
+        entries = [
+            (task.user_id, 'task_completed', *self._build_completion_content(task))
+            for task in tasks
+        ]
+        return await self.send_notifications_bulk_async(entries)
+
+    def send_task_completion_notifications_bulk(self, tasks: List[Task]) -> List[bool]:
+        """
+        Blocking wrapper around send_task_completion_notifications_bulk_async
+
+        Args:
+            tasks: Completed task objects
+
+        Returns:
+            List[bool]: Success flag for each task, in input order
+        """
+        return self.run_async(self.send_task_completion_notifications_bulk_async(tasks))
+    
     def _log_notification_history(self, user_id: str, title: str, body: str, 
                                   data: Optional[Dict[str, Any]], success: bool, 
                                   response_or_error: str) -> None:
@@ -510,6 +732,29 @@ class NotificationService:
             logger.error(f"Error sending task approval notification: {e}")
             return False
     
+    def _build_completion_content(self, task: Task):
+        """Build the (title, body, data) of a task completion notification"""
+        # Create friendly celebration notification
+        import random
+        celebration_messages = [
+            {"title": "🎉 Awesome!", "body": f"You crushed it! '{task.title}' is complete!"},
+            {"title": "💪 Well done!", "body": f"'{task.title}' checked off - you're on fire!"},
+            {"title": "🌟 Great job!", "body": f"'{task.title}' completed - keep it up!"},
+            {"title": "✨ Nice work!", "body": f"Another one done! '{task.title}' complete!"},
+            {"title": "🚀 Amazing!", "body": f"You did it! '{task.title}' is finished!"}
+        ]
+        message = random.choice(celebration_messages)
+        
+        # Create data payload
+        data = {
+            'type': 'task_completed',
+            'task_id': task.id,
+            'task_title': task.title,
+            'task_description': task.description or '',
+            'action': 'open_dashboard'
+        }
+        return message["title"], message["body"], data
+    
     def send_task_completion_notification(self, task: Task) -> bool:
         """
         Send notification when a task is completed
@@ -533,27 +778,7 @@ class NotificationService:
                 logger.warning(f"No FCM tokens found for user {task.user_id}")
                 return False
 
-            # Create friendly celebration notification
-            import random
-            celebration_messages = [
-                {"title": "🎉 Awesome!", "body": f"You crushed it! '{task.title}' is complete!"},
-                {"title": "💪 Well done!", "body": f"'{task.title}' checked off - you're on fire!"},
-                {"title": "🌟 Great job!", "body": f"'{task.title}' completed - keep it up!"},
-                {"title": "✨ Nice work!", "body": f"Another one done! '{task.title}' complete!"},
-                {"title": "🚀 Amazing!", "body": f"You did it! '{task.title}' is finished!"}
-            ]
-            message = random.choice(celebration_messages)
-            title = message["title"]
-            body = message["body"]
-            
-            # Create data payload
-            data = {
-                'type': 'task_completed',
-                'task_id': task.id,
-                'task_title': task.title,
-                'task_description': task.description or '',
-                'action': 'open_dashboard'
-            }
+            title, body, data = self._build_completion_content(task)
             
             # Send to all user devices
             results = self.send_bulk_notifications(user_tokens, title, body, data, task.user_id)
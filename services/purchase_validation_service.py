@@ -1,4 +1,5 @@
 import requests
+import requests.adapters
 import json
 import base64
 import hashlib
@@ -24,6 +25,12 @@ class PurchaseValidationService:
         self.apple_shared_secret = Config.APPLE_SHARED_SECRET if hasattr(Config, 'APPLE_SHARED_SECRET') else None
         self.google_service_account_key = Config.GOOGLE_SERVICE_ACCOUNT_KEY if hasattr(Config, 'GOOGLE_SERVICE_ACCOUNT_KEY') else None
         self.revenuecat_webhook_secret = Config.REVENUECAT_WEBHOOK_SECRET if hasattr(Config, 'REVENUECAT_WEBHOOK_SECRET') else None
+
+        # Shared keep-alive session so repeated validations reuse TLS connections to
+        # Apple/Google; sized for the worker's request threads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self.session.mount('https://', adapter)
     
     def validate_ios_receipt(self, receipt_data: str) -> Tuple[bool, Dict]:
         """
@@ -234,7 +241,7 @@ class PurchaseValidationService:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, headers=headers, timeout=30)
             
             if response.status_code == 200:
                 purchase_data = response.json()
@@ -345,7 +352,7 @@ class PurchaseValidationService:
         logger.info(f"   URL: {url}")
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=receipt_payload,
                 headers={'Content-Type': 'application/json'},
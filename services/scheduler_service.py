@@ -1,11 +1,17 @@
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import logging.handlers
+import queue
+import concurrent.futures
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Callable, Iterable, Iterator
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.executors.pool import ThreadPoolExecutor
 import atexit
+import threading
 import pytz
 import os
 
@@ -24,9 +30,40 @@ file_handler = logging.FileHandler(os.path.join(log_dir, 'reminders.log'))
 file_handler.setLevel(logging.INFO)
 file_formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
 file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+# File writes happen on a listener thread so scheduler jobs never block on log I/O
+log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+log_listener.start()
+
+def _restart_log_listener():
+    """Start a listener in a forked child, which inherits the queue but not the listener's thread"""
+    global log_listener
+    log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    log_listener.start()
+
+def _stop_log_listener():
+    """Flush queued records and stop this process's listener"""
+    log_listener.stop()
+
+os.register_at_fork(after_in_child=_restart_log_listener)
+atexit.register(_stop_log_listener)
 logger.info("📝 Scheduler logging to reminders.log initialized")
 
+# Interval of the due-reminder poll, which is the delivery path; reminders due before the
+# next poll also get their own jobs in the scheduler's process for to-the-second timing
+REMINDER_SWEEP_MINUTES = 1
+# Prefix of the per-reminder DateTrigger job ids (rem:<task>:<reminder>)
+REMINDER_JOB_PREFIX = 'rem:'
+# Users queued on the per-user pool at once by the daily jobs
+USER_JOB_MAX_IN_FLIGHT = 64
+
+def _as_utc(reminder_time: datetime) -> datetime:
+    """Aware UTC reminder time; naive values are UTC, as in FirebaseService._parse_reminder_time"""
+    if reminder_time.tzinfo is None:
+        return reminder_time.replace(tzinfo=timezone.utc)
+    return reminder_time.astimezone(timezone.utc)
+
 class SchedulerService:
     """Service for managing background tasks and notification scheduling"""
     
@@ -34,20 +71,41 @@ class SchedulerService:
         self.firebase_service = firebase_service
         self.notification_service = notification_service
         self.scheduler = None
+        # Process whose scheduler threads are running; forked gunicorn workers inherit
+        # the scheduler objects but not their threads
+        self._owner_pid = None
+        # Health is recorded by the reminder tick instead of a separate polling job
+        self._last_db_ok = None
+        self._last_tick_at = None
+        # Per-reminder DateTrigger jobs by task, and reminders currently being sent
+        self._reminder_jobs = {}
+        self._inflight_reminders = set()
+        # Reminders a DateTrigger job has sent, kept claimed until a sweep query that
+        # started after the send (and so sees its sent flag) has finished
+        self._recently_fired_reminders = set()
+        self._reminder_lock = threading.Lock()
+        # Shared pool for fanning per-user work out of the daily jobs
+        self._user_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=16,
+            thread_name_prefix='scheduler-user'
+        )
         self._initialize_scheduler()
     
     def _initialize_scheduler(self):
         """Initialize the APScheduler with proper configuration"""
         try:
-            # Configure executor
+            # Configure executor (the sweep, the two daily jobs and the few reminder
+            # jobs due before the next sweep)
             executors = {
-                'default': ThreadPoolExecutor(20),
+                'default': ThreadPoolExecutor(5),
             }
             
-            # Job defaults
+            # Job defaults: every job is a singleton, a backlog of missed runs
+            # collapses into one, and short host stalls don't drop runs
             job_defaults = {
-                'coalesce': False,
-                'max_instances': 3
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': 300
             }
             
             # Create scheduler
@@ -68,6 +126,7 @@ class SchedulerService:
         try:
             if self.scheduler and not self.scheduler.running:
                 self.scheduler.start()
+                self._owner_pid = os.getpid()
                 
                 # Add recurring jobs
                 self._add_recurring_jobs()
@@ -88,6 +147,7 @@ class SchedulerService:
         try:
             if self.scheduler and self.scheduler.running:
                 self.scheduler.shutdown(wait=True)
+                self._user_executor.shutdown(wait=True)
                 logger.info("Scheduler shutdown successfully")
         except Exception as e:
             logger.error(f"Error during scheduler shutdown: {e}")
@@ -95,12 +155,15 @@ class SchedulerService:
     def _add_recurring_jobs(self):
         """Add recurring background jobs"""
         try:
-            # Check for due reminders every minute
+            # Check for due reminders every minute. This poll delivers reminders; it also
+            # gives reminders due before the next poll their own DateTrigger job, and runs
+            # once immediately so nothing waits a full interval after a restart.
             self.scheduler.add_job(
                 func=self.process_due_reminders,
-                trigger=IntervalTrigger(minutes=1),
+                trigger=IntervalTrigger(minutes=REMINDER_SWEEP_MINUTES),
                 id='check_due_reminders',
                 name='Check for due reminders',
+                next_run_time=datetime.now(timezone.utc),
                 replace_existing=True
             )
             
@@ -122,15 +185,6 @@ class SchedulerService:
                 replace_existing=True
             )
             
-            # Health check every 5 minutes
-            self.scheduler.add_job(
-                func=self.health_check,
-                trigger=IntervalTrigger(minutes=5),
-                id='health_check',
-                name='System health check',
-                replace_existing=True
-            )
-            
             logger.info("Recurring jobs added successfully")
             
         except Exception as e:
@@ -140,273 +194,339 @@ class SchedulerService:
     def process_due_reminders(self):
         """Process all due reminders and send notifications"""
         try:
-            current_time = datetime.now(pytz.UTC)
-            logger.info(f"📋 ========== PROCESSING DUE REMINDERS ==========")
-            logger.info(f"⏰ Current time (UTC): {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-
-            # Get all users
-            users = self.firebase_service.get_all_users()
-            logger.info(f"👥 Found {len(users)} users to check")
+            current_time = datetime.now(timezone.utc)
+            logger.info("📋 Processing due reminders at %s UTC", current_time.strftime('%Y-%m-%d %H:%M:%S'))
+
+            # Reminders fired before this query started are written as sent, so the
+            # query sees them; anything fired later stays claimed until the next sweep
+            with self._reminder_lock:
+                fired_before_query = set(self._recently_fired_reminders)
+
+            # One query for every user's due reminders (tasks come back hydrated),
+            # looking ahead to the next sweep so upcoming reminders get their own jobs
+            due_reminders = self.firebase_service.get_all_due_reminders(
+                current_time,
+                until=current_time + timedelta(minutes=REMINDER_SWEEP_MINUTES),
+                expire_before=current_time - timedelta(hours=1)
+            )
+            if due_reminders is not None:
+                with self._reminder_lock:
+                    self._recently_fired_reminders -= fired_before_query
+            logger.info("📬 Found %d due or upcoming reminder(s)", len(due_reminders or []))
 
             total_processed = 0
             total_sent = 0
             total_failed = 0
 
-            for user in users:
-                try:
-                    logger.info(f"\n🔍 Checking reminders for user: {user['id']}")
-
-                    # Get active reminders for this user
-                    due_reminders = self.firebase_service.get_due_reminders(
-                        user_id=user['id'],
-                        current_time=current_time
+            # Reminders to notify are collected first and sent in one bulk FCM
+            # dispatch afterwards, instead of one blocking send per reminder
+            pending_sends = []
+            # Share one Task object per task so several due reminders see each other's sent flags
+            tasks_by_id = {}
+            raw_tasks_by_id = {}
+            # Reminder lookup by id per task, built once instead of scanning task.reminders
+            reminder_maps_by_id = {}
+            # Reminder "sent" flags are written at the end of the tick, one transaction per task
+            sent_reminder_ids = set()
+            # Reminders over an hour old, flagged without hydrating or notifying (task_id -> ids)
+            expired_by_task = {}
+            # Tasks whose reminders changed this tick and may now auto-complete
+            completion_candidates = {}
+
+            claimed_reminder_ids = set()
+
+            for reminder_data in due_reminders or []:
+                if reminder_data['reminder_time'] > current_time:
+                    self._schedule_reminder_job(
+                        reminder_data['task_id'],
+                        reminder_data['reminder_id'],
+                        reminder_data['reminder_time']
                     )
+                    continue
 
-                    if not due_reminders:
-                        logger.info(f"   ✓ No due reminders for this user")
+                try:
+                    total_processed += 1
+                    logger.debug("📌 Processing reminder #%d: %s (task %s)",
+                                 total_processed, reminder_data['reminder_id'], reminder_data['task_id'])
+
+                    if reminder_data['expired']:
+                        # FAIL-SAFE: too old to notify, just mark it as sent
+                        logger.warning("⚠️  FAIL-SAFE: Reminder %s is over an hour old, marking as sent without notification",
+                                       reminder_data['reminder_id'])
+                        raw_tasks_by_id.setdefault(reminder_data['task_id'], reminder_data['task'])
+                        expired_by_task.setdefault(reminder_data['task_id'], set()).add(reminder_data['reminder_id'])
+                        total_failed += 1
                         continue
 
-                    logger.info(f"   📬 Found {len(due_reminders)} due reminder(s)")
-
-                    for reminder_data in due_reminders:
-                        total_processed += 1
-                        logger.info(f"\n   📌 Processing reminder #{total_processed}:")
-                        logger.info(f"      Reminder ID: {reminder_data['reminder_id']}")
-                        logger.info(f"      Task ID: {reminder_data['task_id']}")
+                    task = tasks_by_id.get(reminder_data['task_id'])
+                    if task is None:
+                        # Convert to Task object
+                        task = Task.from_dict(reminder_data['task'])
+                        tasks_by_id[task.id] = task
+                        raw_tasks_by_id[task.id] = reminder_data['task']
+                        reminder_maps_by_id[task.id] = {r.id: r for r in task.reminders}
+                    rmap = reminder_maps_by_id[task.id]
+
+                    # Skip if task is not approved or is completed
+                    if task.status not in [TaskStatus.APPROVED, TaskStatus.PENDING]:
+                        logger.debug("⏭️  Skipping - task status is '%s' (not approved/pending)", task.status)
+                        continue
 
-                        # Get the full task data
-                        task_data = self.firebase_service.get_task(reminder_data['task_id'])
-                        if not task_data:
-                            logger.warning(f"      ❌ Task not found: {reminder_data['task_id']}")
-                            total_failed += 1
-                            continue
+                    # Find the specific reminder
+                    reminder = None
+                    r = rmap.get(reminder_data['reminder_id'])
+                    # Task.from_dict already parses reminder times to aware UTC
+                    if r and not r.sent and r.reminder_time <= current_time:
+                        reminder = r
 
-                        # Convert to Task object
-                        task = Task.from_dict(task_data)
-                        logger.info(f"      Task title: '{task.title}'")
-                        logger.info(f"      Task status: {task.status}")
+                    if not reminder:
+                        logger.warning("❌ No matching unsent reminder found for %s", reminder_data['reminder_id'])
+                        total_failed += 1
+                        continue
 
-                        # Skip if task is not approved or is completed
-                        if task.status not in [TaskStatus.APPROVED, TaskStatus.PENDING]:
-                            logger.info(f"      ⏭️  Skipping - task status is '{task.status}' (not approved/pending)")
-                            continue
+                    # Skip reminders a DateTrigger job is sending right now
+                    if not self._claim_reminder(reminder.id):
+                        logger.debug("⏭️  Skipping - reminder %s is already being sent", reminder.id)
+                        continue
+                    claimed_reminder_ids.add(reminder.id)
 
-                        # Find the specific reminder
-                        reminder = None
-                        for r in task.reminders:
-                            if r.id == reminder_data['reminder_id'] and not r.sent:
-                                # Ensure timezone-aware comparison
-                                rt = r.reminder_time
-                                if rt.tzinfo is None:
-                                    # If somehow naive, assume UTC
-                                    rt = rt.replace(tzinfo=pytz.UTC)
-                                    logger.warning(f"      ⚠️ Reminder time was naive, assumed UTC: {rt}")
-
-                                ct = current_time
-                                if ct.tzinfo is None:
-                                    ct = ct.replace(tzinfo=pytz.UTC)
-
-                                # Now safe to compare
-                                if rt <= ct:
-                                    reminder = r
-                                    logger.info(f"      ✅ Matched reminder in task")
-                                    logger.info(f"         Reminder time: {rt.strftime('%Y-%m-%d %H:%M:%S')} UTC")
-                                break
-
-                        if not reminder:
-                            logger.warning(f"      ❌ No matching unsent reminder found for {reminder_data['reminder_id']}")
-                            total_failed += 1
-                            continue
+                    pending_sends.append((reminder, task))
 
-                        # Check if reminder is too old (fail-safe cleanup)
-                        # Ensure timezone-aware for time_diff calculation
-                        rt_for_diff = reminder.reminder_time
-                        if rt_for_diff.tzinfo is None:
-                            rt_for_diff = rt_for_diff.replace(tzinfo=pytz.UTC)
-                        ct_for_diff = current_time
-                        if ct_for_diff.tzinfo is None:
-                            ct_for_diff = ct_for_diff.replace(tzinfo=pytz.UTC)
-
-                        time_diff = ct_for_diff - rt_for_diff
-                        minutes_old = int(time_diff.total_seconds()/60)
-                        logger.info(f"      ⏱️  Reminder is {minutes_old} minutes old")
-
-                        if time_diff.total_seconds() > 3600:  # 1 hour old
-                            logger.warning(f"      ⚠️  FAIL-SAFE: Reminder too old ({minutes_old} min), marking as sent without notification")
-                            self.firebase_service.mark_reminder_as_sent(
-                                task_id=task.id,
-                                reminder_id=reminder.id
-                            )
-
-                            # Update task object
-                            for r in task.reminders:
-                                if r.id == reminder.id:
-                                    r.sent = True
-                                    break
-
-                            # Check if task should be auto-completed
-                            self.check_and_auto_complete_task(task)
-                            total_failed += 1
-                            continue
+                except Exception as e:
+                    logger.error(f"❌ Error processing reminder {reminder_data.get('reminder_id')} for task {reminder_data.get('task_id')}: {e}")
+                    import traceback
+                    logger.error(f"   Traceback: {traceback.format_exc()}")
+                    total_failed += 1
+                    continue
 
-                        # Send notification
-                        logger.info(f"      📤 Attempting to send notification...")
-                        success = self.notification_service.send_reminder_notification(reminder, task)
+            if pending_sends:
+                # Send notifications
+                logger.info("📤 Sending %d notification(s) in bulk", len(pending_sends))
+                results = self.notification_service.send_reminder_notifications_bulk(pending_sends)
 
+                for (reminder, task), success in zip(pending_sends, results):
+                    try:
                         if success:
-                            logger.info(f"      ✅ Notification sent successfully!")
-                            # Mark reminder as sent
-                            self.firebase_service.mark_reminder_as_sent(
-                                task_id=task.id,
-                                reminder_id=reminder.id
-                            )
+                            logger.debug("✅ Notification sent for task %s", task.id)
+                            # Mark reminder as sent (committed per task at the end of the tick)
+                            sent_reminder_ids.add(reminder.id)
                             total_sent += 1
 
                             # Update the task object to reflect the reminder was sent
-                            for r in task.reminders:
-                                if r.id == reminder.id:
-                                    r.sent = True
-                                    break
-
-                            # Check if task should be auto-completed
-                            self.check_and_auto_complete_task(task)
+                            reminder.sent = True
+                            completion_candidates[task.id] = task
                         else:
-                            logger.error(f"      ❌ FAILED to send notification for task: {task.title}")
-                            logger.error(f"         Check notification_service logs for details")
+                            logger.error("❌ FAILED to send notification for task %s (see notification_service logs)", task.id)
                             total_failed += 1
-
+                    except Exception as e:
+                        logger.error(f"❌ Error finalizing reminder {reminder.id} for task {task.id}: {e}")
+                        total_failed += 1
+
+            # Expiring a task's last reminders can complete it; only hydrate those candidates
+            expired_reminder_ids = set()
+            for task_id, reminder_ids in expired_by_task.items():
+                expired_reminder_ids |= reminder_ids
+                try:
+                    task = tasks_by_id.get(task_id)
+                    if task is None:
+                        raw_task = raw_tasks_by_id[task_id]
+                        if raw_task.get('due_date') or not all(
+                            r.get('sent', False) or r.get('id') in reminder_ids for r in raw_task.get('reminders', [])
+                        ):
+                            continue
+                        task = Task.from_dict(raw_task)
+                        reminder_maps_by_id[task_id] = {r.id: r for r in task.reminders}
+                    for reminder_id in reminder_ids:
+                        reminder = reminder_maps_by_id[task_id].get(reminder_id)
+                        if reminder:
+                            reminder.sent = True
+                    completion_candidates[task_id] = task
                 except Exception as e:
-                    logger.error(f"❌ Error processing reminders for user {user['id']}: {e}")
-                    import traceback
-                    logger.error(f"   Traceback: {traceback.format_exc()}")
-                    continue
+                    logger.error(f"❌ Error checking completion for task {task_id} after expiring reminders: {e}")
+
+            # Auto-completions are written in the same per-task transaction as the sent flags
+            completed_tasks = [task for task in completion_candidates.values() if self._should_auto_complete(task)]
+            for task in completed_tasks:
+                logger.info(f"🎯 Auto-completing task {task.id} ({task.title}) - all reminders sent, no due_date")
+
+            try:
+                if sent_reminder_ids or expired_reminder_ids:
+                    self._commit_reminder_tick(
+                        list(raw_tasks_by_id.values()),
+                        sent_reminder_ids,
+                        expired_reminder_ids,
+                        completed_tasks,
+                        current_time
+                    )
+            finally:
+                self._release_reminders(claimed_reminder_ids)
+
+            # The due-reminder query doubles as the database health probe
+            self._last_db_ok = due_reminders is not None
+            self._last_tick_at = current_time
 
-            logger.info(f"\n{'='*60}")
-            logger.info(f"📊 REMINDER PROCESSING SUMMARY:")
-            logger.info(f"   Total processed: {total_processed}")
-            logger.info(f"   Successfully sent: {total_sent}")
-            logger.info(f"   Failed: {total_failed}")
-            logger.info(f"{'='*60}\n")
+            logger.info("📊 Reminder processing summary: processed=%d sent=%d failed=%d",
+                        total_processed, total_sent, total_failed)
 
         except Exception as e:
+            self._last_db_ok = False
             logger.error(f"❌ CRITICAL ERROR in process_due_reminders: {e}")
             import traceback
             logger.error(f"   Traceback: {traceback.format_exc()}")
     
+    def _commit_reminder_tick(self, raw_tasks: List[Dict[str, Any]], sent_reminder_ids,
+                              expired_reminder_ids, completed_tasks: List[Task], now: datetime):
+        """Write a tick's sent flags and completions, then notify only the completions that were saved"""
+        completed_task_ids = self.firebase_service.mark_reminders_as_sent_bulk(
+            raw_tasks,
+            sent_reminder_ids,
+            expired_ids=expired_reminder_ids,
+            completed_task_ids=[task.id for task in completed_tasks],
+            now=now
+        )
+        
+        saved_completions = [task for task in completed_tasks if task.id in completed_task_ids]
+        if saved_completions:
+            self.notification_service.send_task_completion_notifications_bulk(saved_completions)
+    
     def send_daily_summaries(self):
         """Send daily task summaries to all users"""
         try:
             logger.info("Sending daily summaries")
             
-            # Get all users
-            users = self.firebase_service.get_all_users()
+            # Only users with pending or completed-today tasks come back, stats included
+            stats_by_user = self.firebase_service.get_daily_stats_for_active_users()
+            if stats_by_user is None:
+                logger.error("Could not load daily stats, skipping daily summaries")
+                return
             
-            for user in users:
-                try:
-                    user_id = user['id']
-                    
-                    # Get user's task statistics for today
-                    summary_data = self.firebase_service.get_user_daily_stats(user_id)
-                    
-                    # Only send summary if user has pending tasks or completed tasks today
-                    if summary_data.get('pending_tasks', 0) > 0 or summary_data.get('completed_tasks', 0) > 0:
-                        success = self.notification_service.send_daily_summary_notification(
-                            user_id=user_id,
-                            summary_data=summary_data
-                        )
-                        
-                        if success:
-                            logger.info(f"Daily summary sent to user: {user_id}")
-                        else:
-                            logger.error(f"Failed to send daily summary to user: {user_id}")
-                            
-                except Exception as e:
-                    logger.error(f"Error sending daily summary to user {user['id']}: {e}")
-                    continue
+            # Overlap the per-user FCM sends
+            for _ in self._map_users_bounded(self._process_user_summary, stats_by_user.items()):
+                pass
             
             logger.info("Daily summaries processing complete")
             
         except Exception as e:
             logger.error(f"Error in send_daily_summaries: {e}")
     
+    def _map_users_bounded(self, func: Callable[[Dict[str, Any]], Any], users: Iterable[Dict[str, Any]]) -> Iterator[Any]:
+        """Run func over users on the per-user pool, keeping at most USER_JOB_MAX_IN_FLIGHT queued
+
+        Results are yielded in completion order.
+        """
+        pending = set()
+        for user in users:
+            if len(pending) >= USER_JOB_MAX_IN_FLIGHT:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(self._user_executor.submit(func, user))
+        
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+    
+    def _process_user_summary(self, user_stats):
+        """Send the daily summary for a single (user_id, summary_data) pair"""
+        user_id, summary_data = user_stats
+        try:
+            # Only send summary if user has pending tasks or completed tasks today
+            if summary_data.get('pending_tasks', 0) > 0 or summary_data.get('completed_tasks', 0) > 0:
+                success = self.notification_service.send_daily_summary_notification(
+                    user_id=user_id,
+                    summary_data=summary_data
+                )
+                
+                if success:
+                    logger.debug("Daily summary sent to user: %s", user_id)
+                else:
+                    logger.error(f"Failed to send daily summary to user: {user_id}")
+                    
+        except Exception as e:
+            logger.error(f"Error sending daily summary to user {user_id}: {e}")
+    
     def cleanup_old_tasks(self):
         """Clean up completed tasks older than 30 days"""
         try:
             logger.info("Starting cleanup of old completed tasks")
             
-            cutoff_date = datetime.now(pytz.UTC) - timedelta(days=30)
-            
-            # Get all users
-            users = self.firebase_service.get_all_users()
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
             
-            total_cleaned = 0
+            # Stream users and look up each one's old tasks in parallel
+            old_task_ids = []
+            for user_task_ids in self._map_users_bounded(
+                lambda user: self._collect_old_task_ids(user, cutoff_date),
+                self.firebase_service.iter_all_users()
+            ):
+                old_task_ids.extend(user_task_ids)
             
-            for user in users:
-                try:
-                    user_id = user['id']
-                    
-                    # Get old completed tasks for this user
-                    old_tasks = self.firebase_service.get_old_completed_tasks(
-                        user_id=user_id,
-                        cutoff_date=cutoff_date
-                    )
-                    
-                    for task in old_tasks:
-                        # Archive task instead of deleting (soft delete)
-                        success = self.firebase_service.archive_task(task['id'])
-                        if success:
-                            total_cleaned += 1
-                            
-                except Exception as e:
-                    logger.error(f"Error cleaning up tasks for user {user['id']}: {e}")
-                    continue
+            # Archive tasks instead of deleting (soft delete), batched across all users
+            total_cleaned = self.firebase_service.archive_tasks_bulk(old_task_ids) if old_task_ids else 0
             
             logger.info(f"Cleanup complete: {total_cleaned} tasks archived")
             
         except Exception as e:
             logger.error(f"Error in cleanup_old_tasks: {e}")
     
-    def health_check(self):
-        """Perform system health checks"""
+    def _collect_old_task_ids(self, user: Dict[str, Any], cutoff_date: datetime) -> List[str]:
+        """Get the IDs of a single user's completed tasks older than the cutoff"""
         try:
-            # Check database connectivity
-            db_healthy = self.firebase_service.health_check()
-            
-            # Check scheduler status
-            scheduler_healthy = self.scheduler.running if self.scheduler else False
-            
-            # Log health status
-            if db_healthy and scheduler_healthy:
-                logger.debug("System health check: All systems operational")
-            else:
-                logger.warning(f"System health check: DB={db_healthy}, Scheduler={scheduler_healthy}")
-                
+            # Get old completed tasks for this user
+            old_tasks = self.firebase_service.get_old_completed_tasks(
+                user_id=user['id'],
+                cutoff_date=cutoff_date
+            )
+            return [task['id'] for task in old_tasks]
         except Exception as e:
-            logger.error(f"Error in health_check: {e}")
+            logger.error(f"Error cleaning up tasks for user {user['id']}: {e}")
+            return []
+    
+    def health_check(self) -> bool:
+        """Report system health from the last reminder tick (no extra database round-trip)"""
+        scheduler_healthy = self.scheduler.running if self.scheduler else False
+        db_healthy = bool(self._last_db_ok)
+
+        if db_healthy and scheduler_healthy:
+            logger.debug("System health check: All systems operational")
+        else:
+            logger.warning(f"System health check: DB={self._last_db_ok}, Scheduler={scheduler_healthy}")
+        return db_healthy and scheduler_healthy
     
     def schedule_reminder_for_task(self, task: Task):
-        """Schedule all reminders for a specific task"""
+        """Schedule a DateTrigger job for each unsent future reminder of a task"""
         try:
             if task.status not in [TaskStatus.APPROVED, TaskStatus.PENDING]:
                 logger.info(f"Task {task.id} is not approved/pending, skipping reminder scheduling")
                 return
             
-            current_time = datetime.now(pytz.UTC)
+            if not self._owns_scheduler():
+                # Forked worker: its scheduler threads don't exist, so the job would never
+                # fire. The due-reminder poll in the scheduler's process delivers these.
+                logger.debug("Task %s: reminders left to the due-reminder poll", task.id)
+                return
+            
+            current_time = datetime.now(timezone.utc)
             scheduled_count = 0
             
             for reminder in task.reminders:
-                if not reminder.sent and reminder.reminder_time > current_time:
-                    # This will be handled by the recurring job
+                reminder_time = _as_utc(reminder.reminder_time)
+                if not reminder.sent and reminder_time > current_time:
+                    self._schedule_reminder_job(task.id, reminder.id, reminder_time)
                     scheduled_count += 1
             
-            logger.info(f"Task {task.id} has {scheduled_count} reminders that will be processed by scheduler")
+            logger.info(f"Task {task.id}: scheduled {scheduled_count} reminder job(s)")
             
         except Exception as e:
             logger.error(f"Error scheduling reminders for task {task.id}: {e}")
     
     def reschedule_reminders_for_task(self, task_id: str):
         """Reschedule reminders for a task after it's been modified"""
+        if not self._owns_scheduler():
+            # No live reminder jobs in a forked worker; the due-reminder poll picks up the edit
+            return
         try:
+            # Drop jobs for reminders that were removed or moved
+            self.cancel_reminders_for_task(task_id)
+            
             # Get updated task data
             task_data = self.firebase_service.get_task(task_id)
             if not task_data:
@@ -419,6 +539,109 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"Error rescheduling reminders for task {task_id}: {e}")
     
+    def cancel_reminders_for_task(self, task_id: str) -> int:
+        """Remove all pending reminder jobs for a task"""
+        with self._reminder_lock:
+            job_ids = self._reminder_jobs.pop(task_id, set())
+        
+        cancelled_count = 0
+        for job_id in job_ids:
+            try:
+                self.scheduler.remove_job(job_id)
+                cancelled_count += 1
+            except JobLookupError:
+                # Job already ran
+                pass
+        
+        if cancelled_count:
+            logger.info(f"Task {task_id}: cancelled {cancelled_count} reminder job(s)")
+        return cancelled_count
+    
+    def _owns_scheduler(self) -> bool:
+        """Whether this process started the schedulers (and so has their threads)"""
+        return self._owner_pid == os.getpid()
+    
+    def _schedule_reminder_job(self, task_id: str, reminder_id: str, run_date: datetime):
+        """Add (or replace) the DateTrigger job that fires a single reminder"""
+        job_id = f"{REMINDER_JOB_PREFIX}{task_id}:{reminder_id}"
+        self.scheduler.add_job(
+            func=self._fire_reminder,
+            trigger=DateTrigger(run_date=run_date),
+            args=[task_id, reminder_id],
+            id=job_id,
+            name=f"Reminder {reminder_id}",
+            replace_existing=True,
+            misfire_grace_time=300
+        )
+        with self._reminder_lock:
+            self._reminder_jobs.setdefault(task_id, set()).add(job_id)
+    
+    def _claim_reminder(self, reminder_id: str) -> bool:
+        """Mark a reminder as in-flight; False if another job holds it or just sent it"""
+        with self._reminder_lock:
+            if reminder_id in self._inflight_reminders or reminder_id in self._recently_fired_reminders:
+                return False
+            self._inflight_reminders.add(reminder_id)
+            return True
+    
+    def _release_reminders(self, reminder_ids):
+        """Clear the in-flight mark for the given reminders"""
+        with self._reminder_lock:
+            self._inflight_reminders.difference_update(reminder_ids)
+    
+    def _fire_reminder(self, task_id: str, reminder_id: str):
+        """DateTrigger callback: send a single reminder"""
+        self._forget_reminder_job(task_id, reminder_id)
+        
+        if not self._claim_reminder(reminder_id):
+            return
+        
+        try:
+            task_data = self.firebase_service.get_task(task_id)
+            if not task_data:
+                logger.warning(f"Task not found for reminder {reminder_id}: {task_id}")
+                return
+            
+            task = Task.from_dict(task_data)
+            if task.status not in [TaskStatus.APPROVED, TaskStatus.PENDING]:
+                return
+            
+            # The reminder may have been sent by the sweep or removed since scheduling
+            reminder = next((r for r in task.reminders if r.id == reminder_id and not r.sent), None)
+            if not reminder:
+                return
+            
+            # Other due reminders of this task keep their own jobs (or the sweep); sending
+            # them here too would trip the per-user reminder cooldown
+            success = self.notification_service.send_reminder_notifications_bulk([(reminder, task)])[0]
+            if not success:
+                logger.error(f"❌ FAILED to send reminder {reminder_id} for task {task_id}, leaving it for the sweep")
+                return
+            
+            reminder.sent = True
+            self.firebase_service.mark_reminders_as_sent_bulk([task_data], {reminder_id})
+            # A sweep may already hold a snapshot showing this reminder unsent
+            with self._reminder_lock:
+                self._recently_fired_reminders.add(reminder_id)
+            
+            # Check if task should be auto-completed
+            self.check_and_auto_complete_task(task)
+            logger.debug("✅ Reminder %s sent for task %s", reminder_id, task_id)
+            
+        except Exception as e:
+            logger.error(f"Error firing reminder {reminder_id} for task {task_id}: {e}")
+        finally:
+            self._release_reminders([reminder_id])
+    
+    def _forget_reminder_job(self, task_id: str, reminder_id: str):
+        """Drop a reminder job from the per-task bookkeeping"""
+        with self._reminder_lock:
+            task_jobs = self._reminder_jobs.get(task_id)
+            if task_jobs:
+                task_jobs.discard(f"{REMINDER_JOB_PREFIX}{task_id}:{reminder_id}")
+                if not task_jobs:
+                    del self._reminder_jobs[task_id]
+    
     def get_scheduler_status(self) -> Dict[str, Any]:
         """Get current scheduler status and job information"""
         try:
@@ -426,7 +649,11 @@ class SchedulerService:
                 return {"status": "not_initialized"}
 
             jobs = []
+            reminder_job_count = 0
             for job in self.scheduler.get_jobs():
+                if job.id.startswith(REMINDER_JOB_PREFIX):
+                    reminder_job_count += 1
+                    continue
                 jobs.append({
                     "id": job.id,
                     "name": job.name,
@@ -437,46 +664,55 @@ class SchedulerService:
             return {
                 "status": "running" if self.scheduler.running else "stopped",
                 "jobs": jobs,
-                "job_count": len(jobs)
+                "job_count": len(jobs),
+                "reminder_job_count": reminder_job_count,
+                "db_healthy": self._last_db_ok,
+                "last_reminder_tick": self._last_tick_at.isoformat() if self._last_tick_at else None
             }
 
         except Exception as e:
             logger.error(f"Error getting scheduler status: {e}")
             return {"status": "error", "error": str(e)}
 
-    def check_and_auto_complete_task(self, task: Task):
+    def _should_auto_complete(self, task: Task) -> bool:
+        """Whether a task has no due_date and all of its reminders have been sent"""
+        # Check if task has a due_date
+        if task.due_date:
+            logger.debug("Task %s has due_date, skipping auto-complete", task.id)
+            return False
+
+        # Check if task has any reminders
+        if not task.reminders:
+            logger.debug("Task %s has no reminders, skipping auto-complete", task.id)
+            return False
+
+        # Check if all reminders have been sent
+        return all(reminder.sent for reminder in task.reminders)
+    
+    def check_and_auto_complete_task(self, task: Task, now: datetime = None):
         """
         Check if a task should be auto-completed based on reminders.
         A task is auto-completed if:
         1. It has NO due_date
         2. ALL reminders have been sent
+
+        Args:
+            task: Task to check
+            now: Caller's current UTC time, reused for the completion timestamps
         """
         try:
-            # Check if task has a due_date
-            if task.due_date:
-                logger.debug(f"Task {task.id} has due_date, skipping auto-complete")
-                return
-
-            # Check if task has any reminders
-            if not task.reminders or len(task.reminders) == 0:
-                logger.debug(f"Task {task.id} has no reminders, skipping auto-complete")
-                return
-
-            # Check if all reminders have been sent
-            all_reminders_sent = all(reminder.sent for reminder in task.reminders)
-
-            if all_reminders_sent:
+            if self._should_auto_complete(task):
                 logger.info(f"🎯 Auto-completing task {task.id} ({task.title}) - all reminders sent, no due_date")
 
-                # Update task status to COMPLETED
-                from datetime import datetime
+                # Update task status to COMPLETED (timestamps stored as naive UTC like elsewhere)
+                now_iso = (now or datetime.now(timezone.utc)).replace(tzinfo=None).isoformat()
                 try:
                     self.firebase_service.update_task(
                         task_id=task.id,
                         updates={
                             'status': TaskStatus.COMPLETED.value,
-                            'completed_at': datetime.utcnow().isoformat(),
-                            'updated_at': datetime.utcnow().isoformat(),
+                            'completed_at': now_iso,
+                            'updated_at': now_iso,
                             'auto_completed': True
                         }
                     )
@@ -496,9 +732,9 @@ class SchedulerService:
                         logger.error(f"Failed to send completion notification: {notif_error}")
                 else:
                     logger.error(f"❌ Failed to auto-complete task {task.id}")
-            else:
+            elif logger.isEnabledFor(logging.DEBUG):
                 sent_count = sum(1 for r in task.reminders if r.sent)
-                logger.debug(f"Task {task.id} has {sent_count}/{len(task.reminders)} reminders sent")
+                logger.debug("Task %s has %d/%d reminders sent", task.id, sent_count, len(task.reminders))
 
         except Exception as e:
             logger.error(f"Error in check_and_auto_complete_task for task {task.id}: {e}")
\ No newline at end of file
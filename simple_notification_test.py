@@ -3,33 +3,105 @@
 Simple notification test - shows how to test once you have Firebase token
 """
 import requests
+import requests.adapters
+from urllib3.util.retry import Retry
 import json
 import time
+import os
+import base64
 from datetime import datetime, timedelta
 
-def test_with_firebase_token(firebase_token, fcm_token):
+TOKEN_CACHE_PATH = os.path.expanduser("~/.cache/braindumpster_token.json")
+
+def _token_claims(firebase_token):
+    """Decode the (unverified) JWT payload of a Firebase ID token"""
+    try:
+        payload = firebase_token.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except Exception:
+        return {}
+
+def _load_cached_uid(firebase_token):
+    """Return the uid of a previously verified token that is still valid for a minute"""
+    claims = _token_claims(firebase_token)
+    if claims.get('exp', 0) - time.time() <= 60:
+        return None
+    try:
+        with open(TOKEN_CACHE_PATH) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('uid') and cached.get('uid') == claims.get('user_id') and cached.get('exp') == claims.get('exp'):
+        return cached['uid']
+    return None
+
+def _save_cached_uid(firebase_token, uid):
+    """Remember a verified token's uid until it expires"""
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+        with open(TOKEN_CACHE_PATH, 'w') as f:
+            json.dump({'uid': uid, 'exp': _token_claims(firebase_token).get('exp')}, f)
+    except OSError:
+        pass
+
+def _verify_token_offline(firebase_token):
+    """Check the token's signature locally; google-auth fetches Google's public keys on every call"""
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
+    from config import Config
+    
+    decoded = id_token.verify_firebase_token(
+        firebase_token, google_requests.Request(), audience=Config.FIREBASE_PROJECT_ID
+    )
+    return decoded['sub']
+
+def test_with_firebase_token(firebase_token, fcm_token, online=False):
     """Test notifications with Firebase token"""
     base_url = "http://57.129.81.193:5000"
     
+    # One keep-alive session for all three requests so they share a connection;
+    # transient gateway errors are retried on that same pool
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=("POST",))
+    with requests.Session() as session:
+        session.mount("http://", requests.adapters.HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4))
+        return _run_notification_test(session, base_url, firebase_token, fcm_token, online)
+
+def _run_notification_test(session, base_url, firebase_token, fcm_token, online):
+    """Verify the token, register the FCM token and send a test notification"""
     print("🔐 Step 1: Verifying Firebase token...")
     
-    # Verify token
-    verify_response = requests.post(
-        f"{base_url}/api/auth/verify",
-        json={"id_token": firebase_token}
-    )
-    
-    print(f"Token verification: {verify_response.status_code}")
-    if verify_response.status_code != 200:
-        print(f"❌ Token verification failed: {verify_response.text}")
-        return False
-    
-    user_data = verify_response.json()
-    user_id = user_data.get('uid')
-    print(f"✅ Authenticated as: {user_id}")
+    # Skip the round-trip if this token was already verified and hasn't expired
+    user_id = _load_cached_uid(firebase_token)
+    if user_id:
+        print(f"✅ Authenticated as: {user_id} (cached verification)")
+    elif not online:
+        # Verify the signature locally; the server still checks it on every call below
+        try:
+            user_id = _verify_token_offline(firebase_token)
+        except Exception as e:
+            print(f"❌ Token verification failed: {e}")
+            print("   Re-run with --online to verify through the API instead")
+            return False
+        _save_cached_uid(firebase_token, user_id)
+        print(f"✅ Authenticated as: {user_id} (verified offline)")
+    else:
+        # Verify token
+        verify_response = session.post(
+            f"{base_url}/api/auth/verify",
+            json={"id_token": firebase_token}
+        )
+        
+        print(f"Token verification: {verify_response.status_code}")
+        if verify_response.status_code != 200:
+            print(f"❌ Token verification failed: {verify_response.text}")
+            return False
+        
+        user_data = verify_response.json()
+        user_id = user_data.get('uid')
+        _save_cached_uid(firebase_token, user_id)
+        print(f"✅ Authenticated as: {user_id}")
     
-    # Set up session with auth
-    session = requests.Session()
+    # Authenticate the rest of the session's requests
     session.headers.update({"Authorization": f"Bearer {firebase_token}"})
     
     print("\n📱 Step 2: Registering FCM token...")
@@ -96,6 +168,7 @@ def show_instructions():
     print("2️⃣ RUN WITH TOKEN:")
     print("   Once you get the token from Flutter app logs, run:")
     print("   python3 simple_notification_test.py YOUR_FIREBASE_TOKEN_HERE")
+    print("   (add --online to verify the token through the API instead of locally)")
     print()
     print("3️⃣ WATCH YOUR PHONE:")
     print("   You should receive a push notification!")
@@ -110,12 +183,15 @@ def show_instructions():
 def main():
     import sys
     
-    if len(sys.argv) > 1:
-        firebase_token = sys.argv[1]
+    args = [arg for arg in sys.argv[1:] if arg != '--online']
+    online = '--online' in sys.argv[1:]
+    
+    if args:
+        firebase_token = args[0]
         fcm_token = "cXgbHq2EQmeYq2gvy1cu"
         
         print("🧪 Testing with provided Firebase token...")
-        success = test_with_firebase_token(firebase_token, fcm_token)
+        success = test_with_firebase_token(firebase_token, fcm_token, online=online)
         
         if success:
             print("\n🎉 SUCCESS! Your notification system is working!")
@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
 """
 Production startup script for Braindumpster API
-This script configures and starts the Flask app for production use
+This script configures and starts the Flask app under gunicorn for production use
 """
 
 import os
 import sys
-from app import create_app
 
 def main():
     """Start the application in production mode"""
@@ -14,27 +13,31 @@ def main():
     # Set production environment
     os.environ['FLASK_ENV'] = 'production'
     
-    # Create production app
-    app = create_app('production')
-    
     # Production server configuration
     host = os.environ.get('HOST', '0.0.0.0')
     port = int(os.environ.get('PORT', 5000))
+    workers = os.cpu_count() or 1
     
     print(f"🚀 Starting Braindumpster API in PRODUCTION mode")
     print(f"🌐 Server: http://{host}:{port}")
+    print(f"⚙️  Gunicorn: {workers} workers x 8 threads")
     print(f"🔐 Security: Rate limiting enabled")
     print(f"🛡️  CORS: Production origins only")
     print("=" * 50)
     
-    # Start the server
-    app.run(
-        host=host,
-        port=port,
-        debug=False,
-        threaded=True,
-        use_reloader=False
-    )
+    # Hand the process over to gunicorn instead of the single-process Werkzeug
+    # dev server; gunicorn.conf.py supplies logging and limits, the flags below
+    # override its socket and worker settings
+    os.execvp('gunicorn', [
+        'gunicorn',
+        '--config', 'gunicorn.conf.py',
+        '--bind', f"{host}:{port}",
+        '--workers', str(workers),
+        '--worker-class', 'gthread',
+        '--threads', '8',
+        '--keep-alive', '75',
+        "app:create_app('production')"
+    ])
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
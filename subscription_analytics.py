@@ -1,29 +1,45 @@
 #!/usr/bin/env python3
 
 from services.firebase_service import FirebaseService
-from collections import defaultdict
+from collections import Counter
 import json
+import sys
+
+# Raporda kullanılan alanlar; Firestore sadece bunları gönderir
+SUBSCRIPTION_FIELDS = ('is_active', 'is_premium', 'tier', 'platform', 'status', 'user_id', 'expiration_date')
 
 def analyze_subscriptions():
     firebase = FirebaseService()
 
     # Tüm subscription'ları al
     db = firebase.db
-    subscriptions_ref = db.collection('subscriptions')
-    docs = subscriptions_ref.stream()
-
-    subscriptions = []
-    for doc in docs:
-        data = doc.to_dict()
-        subscriptions.append(data)
+    # Sadece raporda kullanılan alanları tek istekte çek
+    subscriptions_ref = db.collection('subscriptions').select(SUBSCRIPTION_FIELDS)
+    subscriptions = [doc.to_dict() for doc in subscriptions_ref.get()]
 
     print('🔍 SUBSCRIPTION ANALYTICS')
     print('=' * 50)
 
-    # Genel istatistikler
+    # Tüm sayaçları tek geçişte hesapla
     total_subs = len(subscriptions)
-    active_subs = sum(1 for s in subscriptions if s.get('is_active', False))
-    premium_users = sum(1 for s in subscriptions if s.get('is_premium', False))
+    active_subs = 0
+    premium_users = 0
+    tier_stats = Counter()
+    tier_active = Counter()
+    platform_stats = Counter()
+    status_stats = Counter()
+    for sub in subscriptions:
+        get = sub.get
+        is_active = get('is_active', False)
+        tier = get('tier', 'unknown')
+        tier_stats[tier] += 1
+        status_stats[get('status', 'unknown')] += 1
+        if is_active:
+            active_subs += 1
+            tier_active[tier] += 1
+            platform_stats[get('platform', 'unknown')] += 1
+        if get('is_premium', False):
+            premium_users += 1
 
     print(f'📊 GENEL İSTATİSTİKLER:')
     print(f'   Toplam Abonelik: {total_subs}')
@@ -33,14 +49,6 @@ def analyze_subscriptions():
     print()
 
     # Tier bazında analiz
-    tier_stats = defaultdict(int)
-    tier_active = defaultdict(int)
-    for sub in subscriptions:
-        tier = sub.get('tier', 'unknown')
-        tier_stats[tier] += 1
-        if sub.get('is_active', False):
-            tier_active[tier] += 1
-
     print(f'📈 TİER BAZINDA ANALİZ:')
     for tier, count in tier_stats.items():
         active_count = tier_active[tier]
@@ -49,23 +57,12 @@ def analyze_subscriptions():
     print()
 
     # Platform bazında analiz
-    platform_stats = defaultdict(int)
-    for sub in subscriptions:
-        platform = sub.get('platform', 'unknown')
-        if sub.get('is_active', False):
-            platform_stats[platform] += 1
-
     print(f'📱 PLATFORM BAZINDA ANALİZ (Aktif):')
     for platform, count in platform_stats.items():
         print(f'   {platform}: {count} aktif kullanıcı')
     print()
 
     # Status bazında analiz
-    status_stats = defaultdict(int)
-    for sub in subscriptions:
-        status = sub.get('status', 'unknown')
-        status_stats[status] += 1
-
     print(f'⚡ STATUS BAZINDA ANALİZ:')
     for status, count in status_stats.items():
         print(f'   {status}: {count} kullanıcı')
@@ -74,13 +71,18 @@ def analyze_subscriptions():
     # Detaylı kullanıcı listesi
     print(f'👥 DETAYLI KULLANICI LİSTESİ:')
     print('-' * 80)
+    # Satırlar tek bir write() ile basılır
+    row_format = '{i:2d}. {status_emoji} {premium_emoji} {user_id:<20} | {tier:<17} | {status:<9} | {platform:<12} | {expiration}'.format
+    rows = []
     for i, sub in enumerate(subscriptions, 1):
         user_id = sub.get('user_id', 'unknown')[:20]  # İlk 20 karakter
         tier = sub.get('tier', 'N/A')
         status = sub.get('status', 'N/A')
         platform = sub.get('platform', 'N/A')
         expiration = sub.get('expiration_date', 'N/A')
-        if expiration and expiration != 'N/A' and len(str(expiration)) > 10:
+        if hasattr(expiration, 'date'):
+            expiration = expiration.date().isoformat()  # Sadece tarih kısmı, tam string üretmeden
+        elif expiration and expiration != 'N/A' and len(str(expiration)) > 10:
             expiration = str(expiration)[:10]  # Sadece tarih kısmı
         elif not expiration:
             expiration = 'Lifetime'
@@ -88,8 +90,19 @@ def analyze_subscriptions():
         status_emoji = '✅' if sub.get('is_active') else '❌'
         premium_emoji = '👑' if sub.get('is_premium') else '🆓'
 
-        print(f'{i:2d}. {status_emoji} {premium_emoji} {user_id:<20} | {tier:<17} | {status:<9} | {platform:<12} | {expiration}')
-
+        rows.append(row_format(
+            i=i,
+            status_emoji=status_emoji,
+            premium_emoji=premium_emoji,
+            user_id=user_id,
+            tier=tier,
+            status=status,
+            platform=platform,
+            expiration=expiration
+        ))
+
+    if rows:
+        sys.stdout.write('\n'.join(rows) + '\n')
     print('-' * 80)
     print(f'Total: {len(subscriptions)} subscribers')
 
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 """
 Direct test of Gemini API with test_audio.mp3
+
+The uploaded file is kept (Gemini holds it for ~48h) and reused on the next run;
+pass --cleanup to delete it from Gemini at the end.
 """
 import os
 import sys
 from datetime import datetime
-import google.generativeai as genai
 from dotenv import load_dotenv
 
+AUDIO_PATH = "/home/ubuntu/test_audio.mp3"
+HANDLE_PATH = "/tmp/.gemini_test_audio_handle"
+
+cleanup = '--cleanup' in sys.argv[1:]
+
 # Load environment variables
 load_dotenv()
 
@@ -17,14 +24,15 @@ if not api_key:
     print("❌ GEMINI_API_KEY not found in environment")
     sys.exit(1)
 
+# Imported only once the key is known; the SDK pulls in grpc/protobuf
+import google.generativeai as genai
+from prompts.gemini_prompts import MEETING_ANALYSIS_PROMPT
+
 genai.configure(api_key=api_key)
 
 # Initialize model - Use Gemini 2.5 Flash (65K output tokens vs 8K for 2.0)
 model = genai.GenerativeModel('gemini-2.5-flash')
 
-# Load prompt from prompts/gemini_prompts.py
-from prompts.gemini_prompts import MEETING_ANALYSIS_PROMPT
-
 # Prepare prompt variables
 current_date = datetime.now().strftime("%Y-%m-%d")
 duration = 1438  # seconds (from previous tests)
@@ -35,21 +43,41 @@ prompt = MEETING_ANALYSIS_PROMPT.format(
     duration=duration
 )
 
-print(f"📤 Uploading /home/ubuntu/test_audio.mp3 to Gemini...")
+def load_cached_upload():
+    """Return the file uploaded by a previous run if Gemini still has it"""
+    try:
+        with open(HANDLE_PATH) as f:
+            cached = genai.get_file(f.read().strip())
+    except Exception:
+        return None
+    if cached.state.name == "ACTIVE" and cached.size_bytes == os.path.getsize(AUDIO_PATH):
+        return cached
+    return None
+
+audio_file = load_cached_upload()
+if audio_file:
+    print(f"♻️  Reusing uploaded file: {audio_file.name}")
+else:
+    print(f"📤 Uploading {AUDIO_PATH} to Gemini...")
 
-# Upload file to Gemini
-audio_file = genai.upload_file(
-    path="/home/ubuntu/test_audio.mp3",
-    mime_type="audio/mpeg"
-)
+    # Upload file to Gemini
+    audio_file = genai.upload_file(
+        path=AUDIO_PATH,
+        mime_type="audio/mpeg"
+    )
 
-print(f"✅ File uploaded: {audio_file.name}")
-print(f"⏳ Waiting for file to be processed...")
+    print(f"✅ File uploaded: {audio_file.name}")
+    with open(HANDLE_PATH, 'w') as f:
+        f.write(audio_file.name)
+    print(f"⏳ Waiting for file to be processed...")
 
 # Wait for file to be active
+# Back off from 100ms up to 2s; short clips are usually ready almost immediately
 import time
+delay = 0.1
 while audio_file.state.name == "PROCESSING":
-    time.sleep(2)
+    time.sleep(delay)
+    delay = min(delay * 1.7, 2.0)
     audio_file = genai.get_file(audio_file.name)
     print(f"   Status: {audio_file.state.name}")
 
@@ -74,8 +102,11 @@ response = model.generate_content(
     generation_config=generation_config
 )
 
+# response.text re-joins the candidate parts on every access, so read it once
+response_text = response.text
+
 print(f"\n✅ Response received!")
-print(f"📏 Response length: {len(response.text)} chars")
+print(f"📏 Response length: {len(response_text)} chars")
 
 # Check finish_reason
 if hasattr(response, 'candidates') and response.candidates:
@@ -88,21 +119,28 @@ if hasattr(response, 'candidates') and response.candidates:
 # Save response to file
 output_file = "/tmp/test_gemini_response.txt"
 with open(output_file, 'w') as f:
-    f.write(response.text)
+    f.write(response_text)
+
+tail = response_text[-500:]
 
 print(f"\n💾 Full response saved to: {output_file}")
 print(f"\n📝 First 500 chars:")
-print(response.text[:500])
+print(response_text[:500])
 print(f"\n📝 Last 500 chars:")
-print(response.text[-500:])
+print(tail)
 
-# Check if response ends properly
-if response.text.strip().endswith('```'):
+# Check if response ends properly (only the tail needs stripping)
+if tail.rstrip().endswith('```'):
     print(f"\n✅ Response ends with ``` (complete)")
 else:
     print(f"\n⚠️  Response does NOT end with ``` (may be truncated)")
-    print(f"   Last 100 chars: {repr(response.text[-100:])}")
-
-# Clean up
-genai.delete_file(audio_file.name)
-print(f"\n🗑️  Deleted uploaded file from Gemini")
+    print(f"   Last 100 chars: {repr(tail[-100:])}")
+
+# Clean up (only on request, so the next run can reuse the upload)
+if cleanup:
+    genai.delete_file(audio_file.name)
+    if os.path.exists(HANDLE_PATH):
+        os.unlink(HANDLE_PATH)
+    print(f"\n🗑️  Deleted uploaded file from Gemini")
+else:
+    print(f"\n📌 Kept uploaded file {audio_file.name} for the next run (--cleanup to delete)")
@@ -3,13 +3,78 @@ Authentication utilities for the Braindumpster API.
 Provides standardized authentication patterns across all endpoints.
 """
 
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from typing import Callable, Optional, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+BEARER_PREFIX = 'Bearer '
+BEARER_PREFIX_LEN = len(BEARER_PREFIX)
+
+# Verified tokens are reused for at most this long (and never past their own exp)
+TOKEN_CACHE_MAX_TTL = 300  # seconds
+TOKEN_CACHE_MAX_SIZE = 10000
+
+# Set once by init_auth() at app start-up so the hot auth path skips the current_app proxy
+_firebase_service: Optional[Any] = None
+
+# blake2b-128(token) -> (expires_at, decoded_token); raw tokens are never stored
+_token_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+def verify_with_cache(token: str, verify: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """
+    Verifies a token through `verify`, reusing recent successful verifications.
+    
+    Clients send the same bearer token on every request, so the RS256 signature
+    check only has to run once per token per TOKEN_CACHE_MAX_TTL. Failed
+    verifications are not cached.
+    
+    Args:
+        token: The JWT token to verify
+        verify: Function that verifies the token and returns the decoded claims
+        
+    Returns:
+        Dict: Decoded token data, or whatever `verify` returned on a miss
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+    
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry:
+            if entry[0] > now:
+                _token_cache.move_to_end(key)
+                return entry[1]
+            del _token_cache[key]
+    
+    decoded_token = verify(token)
+    
+    if decoded_token and 'uid' in decoded_token:
+        expires_at = min(decoded_token.get('exp', 0), now + TOKEN_CACHE_MAX_TTL)
+        if expires_at > now:
+            with _token_cache_lock:
+                _token_cache[key] = (expires_at, decoded_token)
+                if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+                    _token_cache.popitem(last=False)
+    
+    return decoded_token
+
+def init_auth(firebase_svc) -> None:
+    """Initialize the Firebase service used for token verification"""
+    global _firebase_service
+    _firebase_service = firebase_svc
+
+def _get_firebase_service():
+    """Returns the service registered by init_auth, falling back to the current app's"""
+    return _firebase_service if _firebase_service is not None else current_app.firebase_service
+
 class AuthenticationError(Exception):
     """Custom exception for authentication-related errors."""
     
@@ -46,16 +111,13 @@ class AuthManager:
         if not auth_header:
             raise AuthenticationError("Authorization header is missing")
         
-        if not auth_header.startswith('Bearer '):
+        if not auth_header.startswith(BEARER_PREFIX):
             raise AuthenticationError("Authorization header must start with 'Bearer '")
         
-        try:
-            token = auth_header.split('Bearer ')[1]
-            if not token:
-                raise AuthenticationError("Token is empty")
-            return token
-        except IndexError:
-            raise AuthenticationError("Invalid Authorization header format")
+        token = auth_header[BEARER_PREFIX_LEN:].strip()
+        if not token:
+            raise AuthenticationError("Token is empty")
+        return token
     
     @staticmethod
     def verify_token(token: str) -> Dict[str, Any]:
@@ -72,12 +134,12 @@ class AuthManager:
             AuthenticationError: If token is invalid or expired
         """
         try:
-            firebase_service = current_app.firebase_service
+            firebase_service = _get_firebase_service()
             if not firebase_service:
                 logger.error("Firebase service not available")
                 raise AuthenticationError("Authentication service unavailable")
             
-            decoded_token = firebase_service.verify_id_token(token)
+            decoded_token = verify_with_cache(token, firebase_service.verify_id_token)
             
             if not decoded_token:
                 raise AuthenticationError("Invalid or expired token")
@@ -106,12 +168,16 @@ class AuthManager:
         Raises:
             AuthenticationError: If authentication fails
         """
-        # Extract token from Authorization header
-        auth_header = request.headers.get('Authorization')
-        token = AuthManager.extract_token_from_header(auth_header)
-        
-        # Verify token
-        decoded_token = AuthManager.verify_token(token)
+        # Reuse the payload if this request was already authenticated
+        decoded_token = getattr(request, '_verified_payload', None)
+        if decoded_token is None:
+            # Extract token from Authorization header
+            auth_header = request.headers.get('Authorization')
+            token = AuthManager.extract_token_from_header(auth_header)
+            
+            # Verify token
+            decoded_token = AuthManager.verify_token(token)
+            request._verified_payload = decoded_token
         
         # Extract user information
         user_id = decoded_token.get('uid')
@@ -150,13 +216,23 @@ class AuthManager:
         
         logger.debug(f"User access authorized: {authenticated_user_id}")
 
+def _set_authenticated_user(user_id: str, user_email: str, user_timezone: str) -> None:
+    """Exposes the authenticated user on both the request object and flask.g."""
+    request.user_id = user_id
+    request.user_email = user_email
+    request.user_timezone = user_timezone
+    
+    g.user_id = user_id
+    g.user_email = user_email
+    g.user = getattr(request, '_verified_payload', None)
+
 def require_auth(f: Callable) -> Callable:
     """
     Decorator that requires authentication for endpoints.
     
     This decorator:
     1. Extracts and verifies the JWT token
-    2. Adds user_id and user_email to the request object
+    2. Adds user_id and user_email to the request object and flask.g
     3. Provides consistent error handling
     
     Usage:
@@ -174,9 +250,7 @@ def require_auth(f: Callable) -> Callable:
             user_id, user_email, user_timezone = AuthManager.authenticate_request()
             
             # Add user info to request object
-            request.user_id = user_id
-            request.user_email = user_email
-            request.user_timezone = user_timezone
+            _set_authenticated_user(user_id, user_email, user_timezone)
             
             # Call the original function
             return f(*args, **kwargs)
@@ -228,17 +302,15 @@ def require_user_access(user_id_param: str = None) -> Callable:
                 user_id, user_email, user_timezone = AuthManager.authenticate_request()
                 
                 # Add user info to request object
-                request.user_id = user_id
-                request.user_email = user_email
-                request.user_timezone = user_timezone
+                _set_authenticated_user(user_id, user_email, user_timezone)
                 
                 # Validate user access if parameter is specified
                 if user_id_param:
-                    # Get the target user ID from function parameters
+                    # Get the target user ID from function parameters, then the body the
+                    # handler reads (never the query string, which a handler wouldn't act on)
                     target_user_id = kwargs.get(user_id_param)
-                    if not target_user_id:
-                        # Try to get from request data
-                        data = request.get_json() or {}
+                    if not target_user_id and request.is_json:
+                        data = request.get_json(silent=True) or {}
                         target_user_id = data.get(user_id_param)
                     
                     if target_user_id:
@@ -321,7 +393,7 @@ def check_auth_service_health() -> Dict[str, Any]:
         Dict: Health check results
     """
     try:
-        firebase_service = current_app.firebase_service
+        firebase_service = _get_firebase_service()
         if not firebase_service:
             return {
                 "status": "unhealthy",
@@ -4,45 +4,10 @@ import firebase_admin
 from firebase_admin import auth
 import logging
 
-logger = logging.getLogger(__name__)
+# A single require_auth implementation, re-exported here; it also fills g.user_id/g.user_email/g.user
+from utils.auth import require_auth, verify_with_cache, BEARER_PREFIX, BEARER_PREFIX_LEN  # noqa: F401 - re-exported for routes
 
-def require_auth(f):
-    """Decorator to require Firebase authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        # Get the Authorization header
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header:
-            return jsonify({'error': 'Authorization header is required'}), 401
-        
-        try:
-            # Extract the token from "Bearer <token>"
-            if not auth_header.startswith('Bearer '):
-                return jsonify({'error': 'Invalid authorization header format'}), 401
-            
-            id_token = auth_header.split('Bearer ')[1]
-            
-            # Verify the ID token
-            decoded_token = auth.verify_id_token(id_token)
-            
-            # Store user info in g for use in the route
-            g.user_id = decoded_token['uid']
-            g.user_email = decoded_token.get('email')
-            g.user = decoded_token
-            
-            logger.info(f"Authenticated user: {g.user_id}")
-            
-            return f(*args, **kwargs)
-            
-        except ValueError as e:
-            logger.error(f"Token verification failed: {e}")
-            return jsonify({'error': 'Invalid token'}), 401
-        except Exception as e:
-            logger.error(f"Authentication error: {e}")
-            return jsonify({'error': 'Authentication failed'}), 401
-    
-    return decorated_function
+logger = logging.getLogger(__name__)
 
 def get_current_user():
     """Get the current authenticated user from g"""
@@ -63,24 +28,24 @@ def optional_auth(f):
         # Get the Authorization header
         auth_header = request.headers.get('Authorization')
         
-        if auth_header and auth_header.startswith('Bearer '):
-            try:
-                id_token = auth_header.split('Bearer ')[1]
-                decoded_token = auth.verify_id_token(id_token)
-                
-                # Store user info in g
-                g.user_id = decoded_token['uid']
-                g.user_email = decoded_token.get('email')
-                g.user = decoded_token
-                
-                logger.info(f"Optional auth - authenticated user: {g.user_id}")
-                
-            except Exception as e:
-                logger.warning(f"Optional auth failed, continuing without user: {e}")
-                g.user_id = None
-                g.user_email = None
-                g.user = None
-        else:
+        # Anonymous request: g is fresh per request and the get_current_* helpers
+        # already default to None, so there is nothing to set
+        if not auth_header or not auth_header.startswith(BEARER_PREFIX):
+            return f(*args, **kwargs)
+        
+        try:
+            id_token = auth_header[BEARER_PREFIX_LEN:]
+            decoded_token = verify_with_cache(id_token, auth.verify_id_token)
+            
+            # Store user info in g
+            g.user_id = decoded_token['uid']
+            g.user_email = decoded_token.get('email')
+            g.user = decoded_token
+            
+            logger.info(f"Optional auth - authenticated user: {g.user_id}")
+            
+        except Exception as e:
+            logger.warning(f"Optional auth failed, continuing without user: {e}")
             g.user_id = None
             g.user_email = None
             g.user = None
@@ -116,11 +81,11 @@ def require_user_match(user_id_param='user_id'):
             if not current_user_id:
                 return jsonify({'error': 'Authentication required'}), 401
             
-            # Get user_id from request
+            # Get user_id from where the handler reads it: the query string for GET, the body otherwise
             if request.method == 'GET':
                 requested_user_id = request.args.get(user_id_param)
             else:
-                data = request.get_json() or {}
+                data = request.get_json(silent=True) or {}
                 requested_user_id = data.get(user_id_param)
             
             if not requested_user_id:
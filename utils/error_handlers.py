@@ -1,5 +1,7 @@
 import logging
-import traceback
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from typing import Dict, Any, Optional
 from flask import request, jsonify
@@ -7,70 +9,104 @@ from functools import wraps
 
 logger = logging.getLogger(__name__)
 
+# Request bodies larger than this are summarized by size instead of logged
+MAX_LOGGED_BODY_BYTES = 8192
+
+# Request fields never written to error logs
+SENSITIVE_FIELDS = frozenset({'password', 'token', 'receipt_data', 'secret'})
+
 class APIError(Exception):
     """Base class for API errors"""
+    __slots__ = ('message', 'status_code', 'error_code')
+    # Subclasses declare their code once here instead of passing it on every construction
+    default_error_code: Optional[str] = None
+    
     def __init__(self, message: str, status_code: int = 500, error_code: str = None):
         self.message = message
         self.status_code = status_code
-        self.error_code = error_code or self.__class__.__name__
+        self.error_code = error_code or self.default_error_code or self.__class__.__name__
         super().__init__(self.message)
 
 class ValidationError(APIError):
     """Validation error"""
+    __slots__ = ('field',)
+    default_error_code = 'VALIDATION_ERROR'
+    
     def __init__(self, message: str, field: str = None):
         self.field = field
-        super().__init__(message, 400, 'VALIDATION_ERROR')
+        super().__init__(message, 400)
 
 class AuthenticationError(APIError):
     """Authentication error"""
+    default_error_code = 'AUTHENTICATION_ERROR'
+    
     def __init__(self, message: str = "Authentication required"):
-        super().__init__(message, 401, 'AUTHENTICATION_ERROR')
+        super().__init__(message, 401)
 
 class AuthorizationError(APIError):
     """Authorization error"""
+    default_error_code = 'AUTHORIZATION_ERROR'
+    
     def __init__(self, message: str = "Access denied"):
-        super().__init__(message, 403, 'AUTHORIZATION_ERROR')
+        super().__init__(message, 403)
 
 class NotFoundError(APIError):
     """Resource not found error"""
+    default_error_code = 'NOT_FOUND_ERROR'
+    
     def __init__(self, message: str = "Resource not found"):
-        super().__init__(message, 404, 'NOT_FOUND_ERROR')
+        super().__init__(message, 404)
 
 class ConflictError(APIError):
     """Conflict error"""
+    default_error_code = 'CONFLICT_ERROR'
+    
     def __init__(self, message: str = "Resource conflict"):
-        super().__init__(message, 409, 'CONFLICT_ERROR')
+        super().__init__(message, 409)
 
 class RateLimitError(APIError):
     """Rate limit exceeded error"""
+    default_error_code = 'RATE_LIMIT_ERROR'
+    
     def __init__(self, message: str = "Rate limit exceeded"):
-        super().__init__(message, 429, 'RATE_LIMIT_ERROR')
+        super().__init__(message, 429)
 
 class InternalServerError(APIError):
     """Internal server error"""
+    default_error_code = 'INTERNAL_SERVER_ERROR'
+    
     def __init__(self, message: str = "Internal server error"):
-        super().__init__(message, 500, 'INTERNAL_SERVER_ERROR')
+        super().__init__(message, 500)
 
 class ExternalServiceError(APIError):
     """External service error"""
+    __slots__ = ('service',)
+    default_error_code = 'EXTERNAL_SERVICE_ERROR'
+    
     def __init__(self, message: str = "External service error", service: str = None):
         self.service = service
-        super().__init__(message, 502, 'EXTERNAL_SERVICE_ERROR')
+        super().__init__(message, 502)
 
 class SubscriptionError(APIError):
     """Subscription-specific error"""
+    default_error_code = 'SUBSCRIPTION_ERROR'
+    
     def __init__(self, message: str, status_code: int = 400):
-        super().__init__(message, status_code, 'SUBSCRIPTION_ERROR')
+        super().__init__(message, status_code)
 
 class PaymentError(APIError):
     """Payment-specific error"""
+    default_error_code = 'PAYMENT_ERROR'
+    
     def __init__(self, message: str, status_code: int = 402):
-        super().__init__(message, status_code, 'PAYMENT_ERROR')
+        super().__init__(message, status_code)
 
 class RegionalPricingError(APIError):
     """Regional pricing error"""
+    default_error_code = 'REGIONAL_PRICING_ERROR'
+    
     def __init__(self, message: str, status_code: int = 400):
-        super().__init__(message, status_code, 'REGIONAL_PRICING_ERROR')
+        super().__init__(message, status_code)
 
 def handle_api_error(error: APIError) -> tuple:
     """Handle API errors and return appropriate response"""
@@ -95,8 +131,8 @@ def handle_api_error(error: APIError) -> tuple:
 
 def handle_unexpected_error(error: Exception) -> tuple:
     """Handle unexpected errors"""
-    logger.error(f"Unexpected error: {str(error)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
+    # exception() attaches the traceback lazily; it is only formatted if a handler emits the record
+    logger.exception(f"Unexpected error: {str(error)}")
     
     # Log request context for debugging
     if request:
@@ -175,14 +211,17 @@ def log_error_context(error: Exception, context: Dict[str, Any] = None):
         }
         
         # Add request body for POST/PUT requests (be careful with sensitive data)
-        if request.method in ['POST', 'PUT', 'PATCH']:
+        if request.method in ('POST', 'PUT', 'PATCH'):
             try:
-                if request.is_json:
+                if request.content_length and request.content_length > MAX_LOGGED_BODY_BYTES:
+                    # Don't parse large bodies (receipts, base64 blobs) just to log them
+                    error_data['request']['truncated_body_size'] = request.content_length
+                elif request.is_json:
                     request_data = request.get_json()
                     # Remove sensitive data before logging
                     if isinstance(request_data, dict):
                         safe_data = {k: v for k, v in request_data.items() 
-                                   if k not in ['password', 'token', 'receipt_data', 'secret']}
+                                   if k not in SENSITIVE_FIELDS}
                         error_data['request']['data'] = safe_data
             except:
                 pass  # Ignore JSON parsing errors
@@ -193,8 +232,11 @@ class ErrorCollector:
     """Collect and batch errors for reporting"""
     
     def __init__(self):
-        self.errors = []
         self.max_errors = 100
+        # Bounded: appending past max_errors drops the oldest entry in O(1)
+        self.errors = deque(maxlen=self.max_errors)
+        # Request threads add errors while others read summaries
+        self._lock = threading.Lock()
     
     def add_error(self, error: Exception, context: Dict[str, Any] = None):
         """Add an error to the collection"""
@@ -205,37 +247,41 @@ class ErrorCollector:
             'context': context or {}
         }
         
-        self.errors.append(error_entry)
-        
-        # Keep only the most recent errors
-        if len(self.errors) > self.max_errors:
-            self.errors = self.errors[-self.max_errors:]
+        with self._lock:
+            self.errors.append(error_entry)
     
     def get_errors(self, limit: int = None) -> list:
         """Get collected errors"""
+        with self._lock:
+            errors = list(self.errors)
         if limit:
-            return self.errors[-limit:]
-        return self.errors
+            return errors[-limit:]
+        return errors
     
     def clear_errors(self):
         """Clear collected errors"""
-        self.errors.clear()
+        with self._lock:
+            self.errors.clear()
     
     def get_error_summary(self) -> Dict[str, Any]:
         """Get summary of errors"""
-        if not self.errors:
+        # Summarize a snapshot so concurrent add_error calls can't mutate it mid-iteration
+        with self._lock:
+            errors = list(self.errors)
+        
+        if not errors:
             return {'total': 0, 'by_type': {}}
         
         error_counts = {}
-        for error in self.errors:
+        for error in errors:
             error_type = error['error_type']
             error_counts[error_type] = error_counts.get(error_type, 0) + 1
         
         return {
-            'total': len(self.errors),
+            'total': len(errors),
             'by_type': error_counts,
-            'latest': self.errors[-1] if self.errors else None,
-            'oldest': self.errors[0] if self.errors else None
+            'latest': errors[-1],
+            'oldest': errors[0]
         }
 
 # Global error collector instance
@@ -252,7 +298,7 @@ def safe_execute(func, default_value=None, context: Dict[str, Any] = None):
 
 def retry_with_backoff(func, max_retries: int = 3, backoff_factor: float = 1.0):
     """Retry a function with exponential backoff"""
-    import time
+    delays = tuple(backoff_factor * (2 ** attempt) for attempt in range(max_retries))
     
     for attempt in range(max_retries):
         try:
@@ -263,7 +309,7 @@ def retry_with_backoff(func, max_retries: int = 3, backoff_factor: float = 1.0):
                 raise e
             
             # Wait before retrying
-            wait_time = backoff_factor * (2 ** attempt)
+            wait_time = delays[attempt]
             logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {str(e)}")
             time.sleep(wait_time)
     
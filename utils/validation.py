@@ -4,6 +4,7 @@ Provides consistent validation patterns and error handling across all endpoints.
 """
 
 import re
+import sys
 import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union, Tuple
@@ -12,9 +13,24 @@ from models.task import TaskPriority, TaskStatus
 
 logger = logging.getLogger(__name__)
 
+# Python 3.11+ parses a trailing 'Z' in fromisoformat, so no '+00:00' rewrite is needed
+FROMISOFORMAT_HANDLES_Z = sys.version_info >= (3, 11)
+
+# Distinguishes an absent key from one explicitly set to None
+_MISSING = object()
+
+def _fromisoformat(date_str: str) -> datetime:
+    """datetime.fromisoformat that also accepts a trailing 'Z' on older Pythons."""
+    # Remove 'Z' suffix and replace with '+00:00' for proper ISO format (older Pythons only)
+    if not FROMISOFORMAT_HANDLES_Z and date_str.endswith('Z'):
+        date_str = date_str[:-1] + '+00:00'
+    return datetime.fromisoformat(date_str)
+
 class ValidationError(Exception):
     """Custom exception for validation errors with detailed information."""
     
+    __slots__ = ('message', 'field', 'value')
+    
     def __init__(self, message: str, field: Optional[str] = None, value: Any = None):
         self.message = message
         self.field = field
@@ -50,42 +66,45 @@ class DateFormatValidator:
         
         # Handle various date formats
         try:
-            # Remove 'Z' suffix and replace with '+00:00' for proper ISO format
-            normalized_date = date_str
-            if normalized_date.endswith('Z'):
-                normalized_date = normalized_date[:-1] + '+00:00'
-            
             # Try to parse as ISO format
-            parsed_date = datetime.fromisoformat(normalized_date)
-            logger.debug(f"Successfully parsed {field_name}: {date_str} -> {parsed_date}")
+            parsed_date = _fromisoformat(date_str)
+            logger.debug("Successfully parsed %s: %s -> %s", field_name, date_str, parsed_date)
             return parsed_date
             
         except ValueError as e:
-            logger.error(f"Failed to parse {field_name} '{date_str}': {e}")
+            logger.error("Failed to parse %s '%s': %s", field_name, date_str, e)
             raise ValidationError(
                 f"Invalid {field_name} format: {date_str}. Expected ISO format (YYYY-MM-DDTHH:MM:SS)", 
                 field_name, 
                 date_str
             )
 
+# Priority mapping
+PRIORITY_MAPPING = {
+    'low': TaskPriority.LOW,
+    'medium': TaskPriority.MEDIUM,
+    'high': TaskPriority.HIGH,
+    'urgent': TaskPriority.URGENT
+}
+
+# Status mapping
+STATUS_MAPPING = {
+    'pending': TaskStatus.PENDING,
+    'approved': TaskStatus.APPROVED,
+    'completed': TaskStatus.COMPLETED,
+    'cancelled': TaskStatus.CANCELLED
+}
+
+# Every accepted spelling -> enum, including enum values not in the mappings above
+# (e.g. TaskStatus.DELETED), so validation is a single dict lookup
+PRIORITY_LOOKUP = {**{priority.value: priority for priority in TaskPriority}, **PRIORITY_MAPPING}
+STATUS_LOOKUP = {**{status.value: status for status in TaskStatus}, **STATUS_MAPPING}
+
 class EnumValidator:
     """Handles validation and mapping for enumerated values."""
     
-    # Priority mapping
-    PRIORITY_MAPPING = {
-        'low': TaskPriority.LOW,
-        'medium': TaskPriority.MEDIUM,
-        'high': TaskPriority.HIGH,
-        'urgent': TaskPriority.URGENT
-    }
-    
-    # Status mapping
-    STATUS_MAPPING = {
-        'pending': TaskStatus.PENDING,
-        'approved': TaskStatus.APPROVED,
-        'completed': TaskStatus.COMPLETED,
-        'cancelled': TaskStatus.CANCELLED
-    }
+    PRIORITY_MAPPING = PRIORITY_MAPPING
+    STATUS_MAPPING = STATUS_MAPPING
     
     @staticmethod
     def validate_priority(priority_str: str, field_name: str = "priority") -> TaskPriority:
@@ -109,20 +128,12 @@ class EnumValidator:
         if not isinstance(priority_str, str):
             raise ValidationError(f"{field_name} must be a string", field_name, priority_str)
         
-        priority_lower = priority_str.lower().strip()
-        
-        if priority_lower in EnumValidator.PRIORITY_MAPPING:
-            result = EnumValidator.PRIORITY_MAPPING[priority_lower]
-            logger.debug(f"Validated {field_name}: {priority_str} -> {result}")
-            return result
+        priority_lower = priority_str.strip().lower()
         
-        # Try direct enum conversion as fallback
-        try:
-            result = TaskPriority(priority_lower)
-            logger.debug(f"Direct enum conversion for {field_name}: {priority_str} -> {result}")
+        result = PRIORITY_LOOKUP.get(priority_lower)
+        if result is not None:
+            logger.debug("Validated %s: %s -> %s", field_name, priority_str, result)
             return result
-        except ValueError:
-            pass
         
         logger.warning(f"Invalid {field_name} '{priority_str}', defaulting to MEDIUM")
         return TaskPriority.MEDIUM
@@ -148,23 +159,15 @@ class EnumValidator:
         if not isinstance(status_str, str):
             raise ValidationError(f"{field_name} must be a string", field_name, status_str)
         
-        status_lower = status_str.lower().strip()
+        status_lower = status_str.strip().lower()
         
-        if status_lower in EnumValidator.STATUS_MAPPING:
-            result = EnumValidator.STATUS_MAPPING[status_lower]
-            logger.debug(f"Validated {field_name}: {status_str} -> {result}")
+        result = STATUS_LOOKUP.get(status_lower)
+        if result is not None:
+            logger.debug("Validated %s: %s -> %s", field_name, status_str, result)
             return result
         
-        # Try direct enum conversion as fallback
-        try:
-            result = TaskStatus(status_lower)
-            logger.debug(f"Direct enum conversion for {field_name}: {status_str} -> {result}")
-            return result
-        except ValueError:
-            pass
-        
         # List valid options in error message
-        valid_options = list(EnumValidator.STATUS_MAPPING.keys())
+        valid_options = list(STATUS_MAPPING.keys())
         raise ValidationError(
             f"Invalid {field_name} '{status_str}'. Valid options: {valid_options}", 
             field_name, 
@@ -197,7 +200,7 @@ class RequestValidator:
         if missing_fields:
             raise ValidationError(f"Missing required fields: {', '.join(missing_fields)}")
         
-        logger.debug(f"All required fields present: {required_fields}")
+        logger.debug("All required fields present: %s", required_fields)
     
     @staticmethod
     def validate_string_field(data: Dict[str, Any], field_name: str, required: bool = True, 
@@ -236,7 +239,7 @@ class RequestValidator:
         if len(value) > max_length:
             raise ValidationError(f"{field_name} must be no more than {max_length} characters long", field_name, value)
         
-        logger.debug(f"Validated string field {field_name}: length={len(value)}")
+        logger.debug("Validated string field %s: length=%s", field_name, len(value))
         return value
     
     @staticmethod
@@ -274,7 +277,7 @@ class RequestValidator:
         if len(value) > max_items:
             raise ValidationError(f"{field_name} must have no more than {max_items} items", field_name, value)
         
-        logger.debug(f"Validated list field {field_name}: length={len(value)}")
+        logger.debug("Validated list field %s: length=%s", field_name, len(value))
         return value
     
     @staticmethod
@@ -296,7 +299,7 @@ class RequestValidator:
             logger.warning(f"Unauthorized access attempt: {request_user_id} tried to access {target_user_id}'s resources")
             raise ValidationError("Unauthorized: Cannot access another user's resources")
         
-        logger.debug(f"User access validated: {request_user_id}")
+        logger.debug("User access validated: %s", request_user_id)
 
 class TaskValidator:
     """Specialized validator for task-related data."""
@@ -331,43 +334,48 @@ class TaskValidator:
         )
         
         # Validate optional fields
-        if 'due_date' in task_data and task_data['due_date']:
+        due_date = task_data.get('due_date')
+        if due_date:
             validated_data['due_date'] = DateFormatValidator.validate_and_parse_date(
-                task_data['due_date'], f'due_date for task {task_index + 1}'
+                due_date, f'due_date for task {task_index + 1}'
             )
         
-        # Validate priority
-        priority_str = task_data.get('priority', 'medium')
-        validated_data['priority'] = EnumValidator.validate_priority(
-            priority_str, f'priority for task {task_index + 1}'
-        )
+        # Validate priority (missing, null and 'medium' all resolve to MEDIUM without a lookup)
+        priority_str = task_data.get('priority')
+        if priority_str is None or priority_str == 'medium':
+            validated_data['priority'] = TaskPriority.MEDIUM
+        else:
+            validated_data['priority'] = EnumValidator.validate_priority(
+                priority_str, f'priority for task {task_index + 1}'
+            )
         
         # Validate subtasks if present
-        if 'subtasks' in task_data and task_data['subtasks']:
+        if task_data.get('subtasks'):
             validated_data['subtasks'] = RequestValidator.validate_list_field(
                 task_data, 'subtasks', required=False, max_items=50
             )
         
         # Validate reminders if present
-        if 'reminders' in task_data and task_data['reminders']:
+        reminders = task_data.get('reminders')
+        if reminders:
             validated_data['reminders'] = TaskValidator.validate_reminders(
-                task_data['reminders'], task_index
+                reminders, task_index
             )
 
         # Validate recurring fields
-        if 'is_recurring' in task_data:
-            is_recurring = task_data['is_recurring']
+        is_recurring = task_data.get('is_recurring', _MISSING)
+        if is_recurring is not _MISSING:
             if not isinstance(is_recurring, bool):
                 raise ValidationError(f"is_recurring for task {task_index + 1} must be a boolean")
             validated_data['is_recurring'] = is_recurring
 
-        if 'recurring_pattern' in task_data:
-            recurring_pattern = task_data['recurring_pattern']
+        recurring_pattern = task_data.get('recurring_pattern', _MISSING)
+        if recurring_pattern is not _MISSING:
             if not isinstance(recurring_pattern, dict):
                 raise ValidationError(f"recurring_pattern for task {task_index + 1} must be a dictionary")
             validated_data['recurring_pattern'] = recurring_pattern
 
-        logger.debug(f"Task {task_index + 1} validation completed: {validated_data['title']}")
+        logger.debug("Task %s validation completed: %s", task_index + 1, validated_data['title'])
         return validated_data
     
     @staticmethod
@@ -391,32 +399,54 @@ class TaskValidator:
         if len(reminders_data) > 500:
             raise ValidationError(f"Task {task_index + 1} can have at most 500 reminders")
         
-        validated_reminders = []
+        validate_reminder = TaskValidator._validate_reminder
+        validated_reminders = [
+            validate_reminder(reminder_data, i, task_index)
+            for i, reminder_data in enumerate(reminders_data)
+        ]
         
-        for i, reminder_data in enumerate(reminders_data):
-            if not reminder_data:
-                raise ValidationError(f"Reminder {i + 1} for task {task_index + 1} cannot be empty")
-            
-            validated_reminder = {}
-            
-            # Validate reminder_time
-            if 'reminder_time' not in reminder_data:
-                raise ValidationError(f"Reminder {i + 1} for task {task_index + 1} missing reminder_time")
-            
-            validated_reminder['reminder_time'] = DateFormatValidator.validate_and_parse_date(
-                reminder_data['reminder_time'], 
-                f'reminder_time for reminder {i + 1} of task {task_index + 1}'
+        logger.debug("Validated %s reminders for task %s", len(validated_reminders), task_index + 1)
+        return validated_reminders
+
+    @staticmethod
+    def _validate_reminder(reminder_data: Dict[str, Any], reminder_index: int, task_index: int) -> Dict[str, Any]:
+        """
+        Validates one reminder inline, handing off to the general validators only
+        to raise (so error messages are built on failure only).
+        """
+        if not reminder_data:
+            raise ValidationError(f"Reminder {reminder_index + 1} for task {task_index + 1} cannot be empty")
+        
+        # Validate reminder_time
+        if 'reminder_time' not in reminder_data:
+            raise ValidationError(f"Reminder {reminder_index + 1} for task {task_index + 1} missing reminder_time")
+        
+        reminder_time = reminder_data['reminder_time']
+        parsed_time = None
+        if reminder_time and isinstance(reminder_time, str):
+            try:
+                parsed_time = _fromisoformat(reminder_time)
+            except ValueError:
+                pass
+        elif isinstance(reminder_time, datetime):
+            parsed_time = reminder_time
+        if parsed_time is None:
+            parsed_time = DateFormatValidator.validate_and_parse_date(
+                reminder_time,
+                f'reminder_time for reminder {reminder_index + 1} of task {task_index + 1}'
             )
-            
-            # Validate message
-            validated_reminder['message'] = RequestValidator.validate_string_field(
+        
+        # Validate message
+        message = reminder_data.get('message')
+        stripped = message.strip() if isinstance(message, str) else None
+        if stripped and len(stripped) <= 500:
+            message = stripped
+        else:
+            message = RequestValidator.validate_string_field(
                 reminder_data, 'message', required=True, min_length=1, max_length=500
             )
-            
-            validated_reminders.append(validated_reminder)
         
-        logger.debug(f"Validated {len(validated_reminders)} reminders for task {task_index + 1}")
-        return validated_reminders
+        return {'reminder_time': parsed_time, 'message': message}
 
 # Error response utilities
 def create_validation_error_response(error: ValidationError) -> Tuple[Dict[str, Any], int]:
@@ -440,7 +470,7 @@ def create_validation_error_response(error: ValidationError) -> Tuple[Dict[str,
     if error.value is not None:
         response["invalid_value"] = str(error.value)
     
-    logger.error(f"Validation error: {error.message} (field: {error.field}, value: {error.value})")
+    logger.error("Validation error: %s (field: %s, value: %s)", error.message, error.field, error.value)
     return response, 400
 
 def create_auth_error_response(message: str = "Authentication required") -> Tuple[Dict[str, Any], int]:
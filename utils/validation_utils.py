@@ -1,16 +1,108 @@
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, NamedTuple, Optional, Pattern, Tuple, Union
 import re
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Schema type names -> Python types
+_TYPE_MAPPING = {
+    'string': str,
+    'int': int,
+    'integer': int,
+    'float': (int, float),  # Accept both int and float for float fields
+    'number': (int, float),
+    'bool': bool,
+    'boolean': bool,
+    'dict': dict,
+    'object': dict,
+    'list': list,
+    'array': list,
+}
+
+# Format patterns, compiled once at import and applied with fullmatch (anchored at both ends)
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# Product IDs contain only alphanumeric characters, underscores, hyphens and dots
+PRODUCT_ID_RE = re.compile(r'[a-zA-Z0-9._-]+')
+
 class ValidationError(Exception):
     """Custom exception for validation errors"""
+    __slots__ = ('message', 'field')
+    
     def __init__(self, message: str, field: str = None):
         self.message = message
         self.field = field
         super().__init__(self.message)
 
+class _CompiledField(NamedTuple):
+    """One schema field with its config resolved up front"""
+    name: str
+    required: bool
+    expected_type: Optional[str]
+    python_type: Any
+    allowed: Any
+    allowed_set: Optional[frozenset]
+    min_length: Optional[int]
+    max_length: Optional[int]
+    pattern: Optional[Pattern]
+    min_value: Any
+    max_value: Any
+    # (low, high) with infinities for missing bounds, or None if the field has neither
+    num_bounds: Optional[Tuple[Any, Any]]
+
+# id(schema) -> (schema, compiled fields); the schema is kept so its id can't be reused
+_SCHEMA_CACHE: Dict[int, Tuple[Dict[str, Dict], List[_CompiledField]]] = {}
+_SCHEMA_CACHE_MAX_SIZE = 128
+_schema_cache_lock = threading.Lock()
+
+def _compile_schema(schema: Dict[str, Dict]) -> List[_CompiledField]:
+    """Resolve a schema into _CompiledField tuples, once per schema object"""
+    cached = _SCHEMA_CACHE.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    
+    compiled = []
+    for field_name, field_config in schema.items():
+        expected_type = field_config.get('type')
+        python_type = None
+        if expected_type:
+            python_type = _TYPE_MAPPING.get(expected_type.lower())
+            if python_type is None:
+                logger.warning(f"Unknown type: {expected_type}")
+        
+        pattern = field_config.get('pattern')
+        allowed = field_config.get('allowed')
+        min_value = field_config.get('min_value')
+        max_value = field_config.get('max_value')
+        num_bounds = None
+        if min_value is not None or max_value is not None:
+            num_bounds = (
+                min_value if min_value is not None else float('-inf'),
+                max_value if max_value is not None else float('inf'),
+            )
+        compiled.append(_CompiledField(
+            name=field_name,
+            required=field_config.get('required', False),
+            expected_type=expected_type,
+            python_type=python_type,
+            allowed=allowed,
+            # Hash lookup for membership; the original list is kept for error messages
+            allowed_set=frozenset(allowed) if allowed else None,
+            min_length=field_config.get('min_length'),
+            max_length=field_config.get('max_length'),
+            pattern=re.compile(pattern) if pattern else None,
+            min_value=min_value,
+            max_value=max_value,
+            num_bounds=num_bounds,
+        ))
+    
+    with _schema_cache_lock:
+        # Schemas are module constants; a full cache means a caller builds them per call
+        if len(_SCHEMA_CACHE) >= _SCHEMA_CACHE_MAX_SIZE:
+            _SCHEMA_CACHE.clear()
+        _SCHEMA_CACHE[id(schema)] = (schema, compiled)
+    return compiled
+
 def validate_json_data(data: Dict[str, Any], schema: Dict[str, Dict]) -> Dict[str, Any]:
     """
     Validate JSON data against a schema
@@ -35,31 +127,34 @@ def validate_json_data(data: Dict[str, Any], schema: Dict[str, Dict]) -> Dict[st
     validated_data = {}
     
     # Check required fields and validate types
-    for field_name, field_config in schema.items():
+    for field in _compile_schema(schema):
+        field_name = field.name
         value = data.get(field_name)
         
         # Check if field is required
-        if field_config.get('required', False) and value is None:
-            raise ValidationError(f"Field '{field_name}' is required", field_name)
-        
-        # Skip validation for optional fields that are None
-        if value is None and not field_config.get('required', False):
+        if value is None:
+            if field.required:
+                raise ValidationError(f"Field '{field_name}' is required", field_name)
+            # Skip validation for optional fields that are None
             continue
         
         # Validate type
-        expected_type = field_config.get('type')
-        if expected_type and not _validate_type(value, expected_type):
-            raise ValidationError(f"Field '{field_name}' must be of type {expected_type}", field_name)
+        if field.python_type is not None and not isinstance(value, field.python_type):
+            raise ValidationError(f"Field '{field_name}' must be of type {field.expected_type}", field_name)
         
         # Validate allowed values
-        allowed_values = field_config.get('allowed')
-        if allowed_values and value not in allowed_values:
-            raise ValidationError(f"Field '{field_name}' must be one of {allowed_values}", field_name)
+        if field.allowed_set is not None:
+            try:
+                rejected = value not in field.allowed_set
+            except TypeError:
+                rejected = True  # Unhashable values (lists, dicts) can't equal an allowed option
+            if rejected:
+                raise ValidationError(f"Field '{field_name}' must be one of {field.allowed}", field_name)
         
         # Validate string length
         if isinstance(value, str):
-            min_length = field_config.get('min_length')
-            max_length = field_config.get('max_length')
+            min_length = field.min_length
+            max_length = field.max_length
             
             if min_length and len(value) < min_length:
                 raise ValidationError(f"Field '{field_name}' must be at least {min_length} characters long", field_name)
@@ -68,20 +163,18 @@ def validate_json_data(data: Dict[str, Any], schema: Dict[str, Dict]) -> Dict[st
                 raise ValidationError(f"Field '{field_name}' must be at most {max_length} characters long", field_name)
             
             # Validate pattern
-            pattern = field_config.get('pattern')
-            if pattern and not re.match(pattern, value):
+            if field.pattern is not None and not field.pattern.match(value):
                 raise ValidationError(f"Field '{field_name}' does not match required pattern", field_name)
         
         # Validate numeric values
-        if isinstance(value, (int, float)):
-            min_value = field_config.get('min_value')
-            max_value = field_config.get('max_value')
-            
-            if min_value is not None and value < min_value:
-                raise ValidationError(f"Field '{field_name}' must be at least {min_value}", field_name)
-            
-            if max_value is not None and value > max_value:
-                raise ValidationError(f"Field '{field_name}' must be at most {max_value}", field_name)
+        if field.num_bounds is not None and isinstance(value, (int, float)):
+            low, high = field.num_bounds
+            # One chained compare on the common in-range path; work out which bound failed only on error
+            if not low <= value <= high:
+                if value < low:
+                    raise ValidationError(f"Field '{field_name}' must be at least {field.min_value}", field_name)
+                if value > high:
+                    raise ValidationError(f"Field '{field_name}' must be at most {field.max_value}", field_name)
         
         validated_data[field_name] = value
     
@@ -89,75 +182,54 @@ def validate_json_data(data: Dict[str, Any], schema: Dict[str, Dict]) -> Dict[st
 
 def _validate_type(value: Any, expected_type: str) -> bool:
     """Validate if a value matches the expected type"""
-    type_mapping = {
-        'string': str,
-        'int': int,
-        'integer': int,
-        'float': (int, float),  # Accept both int and float for float fields
-        'number': (int, float),
-        'bool': bool,
-        'boolean': bool,
-        'dict': dict,
-        'object': dict,
-        'list': list,
-        'array': list,
-    }
-    
-    expected_python_type = type_mapping.get(expected_type.lower())
+    expected_python_type = _TYPE_MAPPING.get(expected_type.lower())
     if not expected_python_type:
         logger.warning(f"Unknown type: {expected_type}")
         return True  # Allow unknown types
     
     return isinstance(value, expected_python_type)
 
+def _normalize_str(value: Any) -> Optional[str]:
+    """Return the stripped string, or None if value is not a string"""
+    return value.strip() if isinstance(value, str) else None
+
 def validate_email(email: str) -> bool:
     """Validate email address format"""
-    if not isinstance(email, str):
-        return False
-    
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email.strip()) is not None
+    email = _normalize_str(email)
+    return email is not None and EMAIL_RE.fullmatch(email) is not None
 
 def validate_user_id(user_id: str) -> bool:
     """Validate Firebase user ID format"""
-    if not isinstance(user_id, str):
-        return False
+    user_id = _normalize_str(user_id)
     
     # Firebase user IDs are typically 28 characters long
-    return len(user_id.strip()) >= 10 and len(user_id.strip()) <= 50
+    return user_id is not None and 10 <= len(user_id) <= 50
 
 def validate_transaction_id(transaction_id: str) -> bool:
     """Validate transaction ID format"""
-    if not isinstance(transaction_id, str):
-        return False
-    
     # Transaction IDs should be non-empty strings
-    return len(transaction_id.strip()) > 0
+    return bool(_normalize_str(transaction_id))
 
 def validate_country_code(country_code: str) -> bool:
     """Validate ISO 3166-1 alpha-2 country code"""
-    if not isinstance(country_code, str):
-        return False
+    country_code = _normalize_str(country_code)
     
     # ISO 3166-1 alpha-2 codes are exactly 2 characters
-    return len(country_code.strip().upper()) == 2 and country_code.isalpha()
+    return country_code is not None and len(country_code) == 2 and country_code.isalpha()
 
 def validate_currency_code(currency_code: str) -> bool:
     """Validate ISO 4217 currency code"""
-    if not isinstance(currency_code, str):
-        return False
+    currency_code = _normalize_str(currency_code)
     
     # ISO 4217 codes are exactly 3 characters
-    return len(currency_code.strip().upper()) == 3 and currency_code.isalpha()
+    return currency_code is not None and len(currency_code) == 3 and currency_code.isalpha()
 
 def validate_product_id(product_id: str) -> bool:
     """Validate product ID format"""
-    if not isinstance(product_id, str):
-        return False
+    product_id = _normalize_str(product_id)
     
-    # Product IDs should be non-empty and contain only alphanumeric characters, underscores, and dots
-    pattern = r'^[a-zA-Z0-9._-]+$'
-    return len(product_id.strip()) > 0 and re.match(pattern, product_id.strip())
+    # Product IDs should be non-empty and match PRODUCT_ID_RE
+    return bool(product_id) and PRODUCT_ID_RE.fullmatch(product_id) is not None
 
 def validate_price(price: Union[int, float]) -> bool:
     """Validate price value"""
@@ -181,77 +253,77 @@ def sanitize_string(value: str, max_length: int = None) -> str:
     
     return sanitized
 
+SUBSCRIPTION_DATA_SCHEMA = {
+    'user_id': {
+        'type': 'string',
+        'required': True,
+        'min_length': 10,
+        'max_length': 50
+    },
+    'tier': {
+        'type': 'string',
+        'required': True,
+        'allowed': ['monthly_premium', 'yearly_premium', 'lifetime_premium']
+    },
+    'status': {
+        'type': 'string',
+        'required': True,
+        'allowed': ['active', 'expired', 'cancelled', 'pending', 'grace_period', 'billing_issue']
+    },
+    'transaction_id': {
+        'type': 'string',
+        'required': False,
+        'min_length': 1
+    },
+    'platform': {
+        'type': 'string',
+        'required': False,
+        'allowed': ['ios', 'android', 'flutter', 'web', 'revenuecat']
+    },
+    'price': {
+        'type': 'float',
+        'required': False,
+        'min_value': 0
+    },
+    'currency': {
+        'type': 'string',
+        'required': False,
+        'min_length': 3,
+        'max_length': 3
+    }
+}
+
 def validate_subscription_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Validate subscription-specific data"""
-    schema = {
-        'user_id': {
-            'type': 'string',
-            'required': True,
-            'min_length': 10,
-            'max_length': 50
-        },
-        'tier': {
-            'type': 'string',
-            'required': True,
-            'allowed': ['monthly_premium', 'yearly_premium', 'lifetime_premium']
-        },
-        'status': {
-            'type': 'string',
-            'required': True,
-            'allowed': ['active', 'expired', 'cancelled', 'pending', 'grace_period', 'billing_issue']
-        },
-        'transaction_id': {
-            'type': 'string',
-            'required': False,
-            'min_length': 1
-        },
-        'platform': {
-            'type': 'string',
-            'required': False,
-            'allowed': ['ios', 'android', 'flutter', 'web', 'revenuecat']
-        },
-        'price': {
-            'type': 'float',
-            'required': False,
-            'min_value': 0
-        },
-        'currency': {
-            'type': 'string',
-            'required': False,
-            'min_length': 3,
-            'max_length': 3
-        }
+    return validate_json_data(data, SUBSCRIPTION_DATA_SCHEMA)
+
+ANALYTICS_DATA_SCHEMA = {
+    'user_id': {
+        'type': 'string',
+        'required': True,
+        'min_length': 10,
+        'max_length': 50
+    },
+    'event': {
+        'type': 'string',
+        'required': True,
+        'min_length': 1,
+        'max_length': 100
+    },
+    'timestamp': {
+        'type': 'string',
+        'required': False
+    },
+    'platform': {
+        'type': 'string',
+        'required': False,
+        'allowed': ['ios', 'android', 'flutter', 'web']
     }
-    
-    return validate_json_data(data, schema)
+}
 
 def validate_analytics_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Validate analytics event data"""
-    schema = {
-        'user_id': {
-            'type': 'string',
-            'required': True,
-            'min_length': 10,
-            'max_length': 50
-        },
-        'event': {
-            'type': 'string',
-            'required': True,
-            'min_length': 1,
-            'max_length': 100
-        },
-        'timestamp': {
-            'type': 'string',
-            'required': False
-        },
-        'platform': {
-            'type': 'string',
-            'required': False,
-            'allowed': ['ios', 'android', 'flutter', 'web']
-        }
-    }
-    
-    return validate_json_data(data, schema)
+    return validate_json_data(data, ANALYTICS_DATA_SCHEMA)
 
 class FieldValidator:
     """Utility class for field-specific validation"""
@@ -259,7 +331,7 @@ class FieldValidator:
     @staticmethod
     def required(value: Any, field_name: str = "field") -> Any:
         """Check if required field has a value"""
-        if value is None or (isinstance(value, str) and not value.strip()):
+        if value is None or _normalize_str(value) == '':
             raise ValidationError(f"{field_name} is required")
         return value
     